@@ -0,0 +1,110 @@
+"""
+Compare websocket message decode throughput of a full json.loads plus dict lookups against TickDecoder
+on each available backend, for Deribit and Bybit ticker payloads. Payloads are generated in the
+shape of the exchanges' ticker messages unless recorded ones (one raw message per line) are passed.
+
+    python benchmarks/json_decode.py --messages 200000
+    python benchmarks/json_decode.py --deribit-file deribit.jsonl --bybit-file bybit.jsonl
+"""
+import argparse
+import json
+import time
+import numpy as np
+from py_vol_surface import utils
+
+
+def deribit_payload(rng, idx):
+    strike = 40000 + 1000 * (idx % 60)
+    bid = round(rng.uniform(0.001, 0.2), 4)
+    data = {"timestamp": 1735000000000 + idx, "stats": {"volume_usd": 1.2e6, "volume": 12.3, "price_change": -1.5, "low": 0.01, "high": 0.2},
+            "state": "open", "settlement_price": 0.05, "open_interest": 120.5, "min_price": 0.0001, "max_price": 0.3,
+            "mark_price": bid + 0.0005, "mark_iv": 55.1, "last_price": bid, "interest_rate": 0.0, "instrument_name": f"BTC-27DEC24-{strike}-C",
+            "index_price": 60000.5, "greeks": {"vega": 30.1, "theta": -20.2, "rho": 10.3, "gamma": 0.0001, "delta": 0.5},
+            "estimated_delivery_price": 60000.5, "bid_iv": 54.0, "best_bid_price": bid, "best_bid_amount": 10.0, "best_ask_price": bid + 0.001,
+            "best_ask_amount": 12.5, "ask_iv": 56.2, "underlying_price": 60100.5, "underlying_index": "BTC-27DEC24"}
+    return json.dumps({"jsonrpc": "2.0", "method": "subscription", "params": {"channel": f"ticker.{data['instrument_name']}.100ms", "data": data}})
+
+
+def bybit_payload(rng, idx):
+    strike = 40000 + 1000 * (idx % 60)
+    bid = round(rng.uniform(10, 5000), 1)
+    data = {"symbol": f"BTC-27DEC24-{strike}-C", "bidPrice": str(bid), "bidSize": "1.5", "bidIv": "0.54", "askPrice": str(bid + 5),
+            "askSize": "2", "askIv": "0.56", "lastPrice": str(bid), "highPrice24h": "5100", "lowPrice24h": "10", "markPrice": str(bid + 2.5),
+            "indexPrice": "60000.5", "markPriceIv": "0.55", "underlyingPrice": "60100.5", "openInterest": "120.5", "turnover24h": "1200000",
+            "volume24h": "12.3", "totalVolume": "400", "totalTurnover": "24000000", "delta": "0.5", "gamma": "0.0001", "vega": "30.1",
+            "theta": "-20.2", "predictedDeliveryPrice": "0", "change24h": "-0.015"}
+    return json.dumps({"id": f"tickers.{data['symbol']}-{idx}", "topic": f"tickers.{data['symbol']}", "ts": 1735000000000 + idx, "data": data})
+
+
+def load_payloads(path, n_messages):
+    with open(path, "rb") as file:
+        payloads = [line.rstrip(b"\n") for line in file if line.strip()]
+    return (payloads * (n_messages // len(payloads) + 1))[:n_messages]
+
+
+def dict_lookup(loads, payload_path, timestamp_path, websocket_json_format):
+    def decode(message):
+        message = loads(message)
+        data = message
+        for key in payload_path:
+            data = data[key]
+        timestamp = message
+        for key in timestamp_path:
+            timestamp = timestamp[key]
+        return data[websocket_json_format["instrument_key"]], float(data[websocket_json_format["bid_key"]]), float(data[websocket_json_format["ask_key"]]), timestamp
+    return decode
+
+
+def throughput(decode, payloads, repeats):
+    best = np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for message in payloads:
+            decode(message)
+        best = min(best, time.perf_counter() - start)
+    return len(payloads) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--deribit-file", default=None, help="recorded Deribit messages, one per line")
+    parser.add_argument("--bybit-file", default=None, help="recorded Bybit messages, one per line")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    exchanges = {"deribit": {"websocket_json_format": utils.create_websocket_json_formatter("instrument_name", "best_bid_price", "best_ask_price", "timestamp"),
+                             "payload_path": ("params", "data"),
+                             "field_paths": {},
+                             "timestamp_path": ("params", "data", "timestamp"),
+                             "file": args.deribit_file,
+                             "generator": deribit_payload},
+                 "bybit": {"websocket_json_format": utils.create_websocket_json_formatter("symbol", "bidPrice", "askPrice", "ts"),
+                           "payload_path": ("data",),
+                           "field_paths": {"timestamp": ("ts",)},
+                           "timestamp_path": ("ts",),
+                           "file": args.bybit_file,
+                           "generator": bybit_payload}}
+
+    print(f"{'exchange':>8} {'decoder':>22} {'msg/s':>12} {'us/msg':>8} {'speedup':>8}")
+    for exchange, config in exchanges.items():
+        if config["file"] is None:
+            payloads = [config["generator"](rng, idx).encode() for idx in range(args.messages)]
+        else:
+            payloads = load_payloads(config["file"], args.messages)
+
+        cases = [("json.loads + dict", dict_lookup(json.loads, config["payload_path"], config["timestamp_path"], config["websocket_json_format"]))]
+        for backend in utils.TickDecoder.available_backends():
+            decoder = utils.TickDecoder(config["websocket_json_format"], config["payload_path"], config["field_paths"], backend=backend)
+            cases.append((f"TickDecoder {backend}", decoder.decode))
+
+        baseline = None
+        for name, decode in cases:
+            rate = throughput(decode, payloads, args.repeats)
+            baseline = rate if baseline is None else baseline
+            print(f"{exchange:>8} {name:>22} {rate:>12,.0f} {1e6 / rate:>8.2f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Replay a Bybit spot orderbook delta stream through the list-based book the Bybit streamer used to keep
+and through utils.OrderBook. Processing time per message and the fastest sustainable replay speed come
+from an unpaced pass, the lag behind the replay clock from a pass paced at --speed times real time.
+The stream is synthetic (a snapshot followed by deltas that update, insert and delete levels around a
+drifting mid) unless a recording with one raw message per line is passed.
+
+    python benchmarks/orderbook_replay.py --messages 5000 --depth 200 --speed 10
+    python benchmarks/orderbook_replay.py --file bybit_orderbook.jsonl
+"""
+import argparse
+import json
+import time
+import numpy as np
+from py_vol_surface import utils
+
+
+def synthetic_stream(n_messages, depth, interval_ms, levels_per_delta, rng):
+    tick = 0.01
+    mid = 60000.
+    book = {"b": {}, "a": {}}
+    for jdx in range(depth):
+        book["b"][f"{mid - tick * (jdx + 1):.2f}"] = f"{rng.uniform(0.001, 2):.6f}"
+        book["a"][f"{mid + tick * (jdx + 1):.2f}"] = f"{rng.uniform(0.001, 2):.6f}"
+    ts = 1735000000000
+    messages = [{"topic": "orderbook.200.BTCUSDT", "ts": ts, "type": "snapshot",
+                 "data": {"s": "BTCUSDT", "b": [list(level) for level in book["b"].items()], "a": [list(level) for level in book["a"].items()], "u": 1, "seq": 1}}]
+
+    for idx in range(1, n_messages):
+        mid += tick * rng.integers(-3, 4)
+        ts += interval_ms
+        delta = {"b": [], "a": []}
+        for side, sign in (("b", -1), ("a", 1)):
+            for _ in range(levels_per_delta):
+                action = rng.random()
+                if action < 0.3 and len(book[side]) > depth // 2:
+                    price = rng.choice(list(book[side]))
+                    del book[side][price]
+                    delta[side].append([price, "0"])
+                else:
+                    price = f"{mid + sign * tick * rng.integers(1, depth):.2f}"
+                    size = f"{rng.uniform(0.001, 2):.6f}"
+                    book[side][price] = size
+                    delta[side].append([price, size])
+        messages.append({"topic": "orderbook.200.BTCUSDT", "ts": ts, "type": "delta",
+                         "data": {"s": "BTCUSDT", "b": delta["b"], "a": delta["a"], "u": idx + 1, "seq": idx + 1}})
+    return [json.dumps(message) for message in messages]
+
+
+def _find_index(source, target, key):
+    return next(i for i, j in enumerate(source) if j[key] == target[key])
+
+
+class ListOrderBook:
+    def __init__(self):
+        self.data = {}
+
+    def process(self, message):
+        if "snapshot" in message["type"]:
+            self.data = message["data"]
+            return
+        for side in ("b", "a"):
+            for entry in message["data"][side]:
+                if float(entry[1]) == 0:
+                    index = _find_index(self.data[side], entry, 0)
+                    self.data[side].pop(index)
+                    continue
+                if not entry[0] in [level[0] for level in self.data[side]]:
+                    self.data[side].append(entry)
+                    continue
+                index = _find_index(self.data[side], entry, 0)
+                self.data[side][index] = entry
+
+    def top(self):
+        return float(self.data["b"][0][0]), float(self.data["a"][0][0])
+
+
+class SortedOrderBook:
+    def __init__(self):
+        self.orderbook = utils.OrderBook()
+
+    def process(self, message):
+        data = message["data"]
+        if "snapshot" in message["type"]:
+            self.orderbook.snapshot(data["b"], data["a"])
+        else:
+            self.orderbook.update(data["b"], data["a"])
+
+    def top(self):
+        return self.orderbook.best_bid, self.orderbook.best_ask
+
+
+def replay(book, messages, speed):
+    ts0 = messages[0]["ts"]
+    processing = np.empty(len(messages))
+    lag = np.empty(len(messages))
+    start = time.perf_counter()
+    for idx, message in enumerate(messages):
+        target = start + (message["ts"] - ts0) / 1000 / speed if speed else time.perf_counter()
+        now = time.perf_counter()
+        if now < target:
+            time.sleep(target - now)
+        tick_start = time.perf_counter()
+        book.process(message)
+        book.top()
+        done = time.perf_counter()
+        processing[idx] = done - tick_start
+        lag[idx] = max(done - target, 0)
+    return processing, lag
+
+
+def check_top_of_book(messages):
+    book = SortedOrderBook()
+    levels = {"b": {}, "a": {}}
+    for message in messages:
+        if "snapshot" in message["type"]:
+            levels = {"b": {}, "a": {}}
+        for side in ("b", "a"):
+            for price, size in message["data"][side]:
+                if float(size) == 0:
+                    levels[side].pop(float(price), None)
+                else:
+                    levels[side][float(price)] = float(size)
+        book.process(message)
+        assert book.top() == (max(levels["b"]), min(levels["a"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--depth", type=int, default=200)
+    parser.add_argument("--interval-ms", type=int, default=100, help="time between synthetic messages")
+    parser.add_argument("--levels-per-delta", type=int, default=10)
+    parser.add_argument("--speed", type=float, default=10, help="replay speed as a multiple of real time")
+    parser.add_argument("--file", default=None, help="recorded Bybit orderbook messages, one per line")
+    args = parser.parse_args()
+
+    if args.file is None:
+        payloads = synthetic_stream(args.messages, args.depth, args.interval_ms, args.levels_per_delta, np.random.default_rng(0))
+    else:
+        with open(args.file, "r") as file:
+            payloads = [line for line in file if line.strip()][:args.messages]
+
+    check_top_of_book([json.loads(payload) for payload in payloads])
+    duration = (json.loads(payloads[-1])["ts"] - json.loads(payloads[0])["ts"]) / 1000
+    print(f"{len(payloads)} messages, {duration:.1f}s of stream replayed in {duration / args.speed:.1f}s at {args.speed:g}x real time")
+    print(f"{'book':>8} {'mean (us)':>10} {'p99 (us)':>10} {'max speed':>10} {'p99 lag (ms)':>13} {'max lag (ms)':>13}")
+    for name, book_class in (("list", ListOrderBook), ("sorted", SortedOrderBook)):
+        processing, _ = replay(book_class(), [json.loads(payload) for payload in payloads], None)
+        _, lag = replay(book_class(), [json.loads(payload) for payload in payloads], args.speed)
+        print(f"{name:>8} {processing.mean() * 1e6:>10.1f} {np.percentile(processing, 99) * 1e6:>10.1f} {duration / processing.sum():>9.0f}x "
+              f"{np.percentile(lag, 99) * 1e3:>13.2f} {lag.max() * 1e3:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
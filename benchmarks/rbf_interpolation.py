@@ -0,0 +1,71 @@
+"""
+Compare fit/evaluate time and peak RSS growth of the global and local (neighbor-limited)
+CustomRBFInterpolator modes on synthetic vol surfaces.
+
+    python benchmarks/rbf_interpolation.py --sizes 500 2000 10000 --neighbors 50
+"""
+import argparse
+import multiprocessing
+import resource
+import time
+import numpy as np
+from py_vol_surface.interpolation_engines import CustomRBFInterpolator
+
+
+def synthetic_surface(n_nodes, rng):
+    strike = rng.uniform(0.5, 1.5, n_nodes)
+    expiry = rng.uniform(0.02, 2, n_nodes)
+    ivol = 0.2 + 0.3 * (strike - 1) ** 2 + 0.05 * np.sqrt(expiry) + rng.normal(0, 0.002, n_nodes)
+    return strike, expiry, ivol
+
+
+def run_case(n_nodes, neighbors, n_grid, n_refits, seed):
+    rng = np.random.default_rng(seed)
+    x, y, z = synthetic_surface(n_nodes, rng)
+    xi, yi = np.linspace(0.5, 1.5, n_grid), np.linspace(0.02, 2, n_grid)
+
+    interpolator = CustomRBFInterpolator(n_grid, n_grid)
+    if not neighbors is None:
+        interpolator.set_neighbors(neighbors)
+
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    interpolator.fit(x, y, z)
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    interpolator.evaluate(xi, yi)
+    evaluate_time = time.perf_counter() - start
+    peak_memory = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_rss) * 1024
+
+    interpolator.fit(x, y, z + rng.normal(0, 0.001, n_nodes))
+    start = time.perf_counter()
+    for _ in range(n_refits):
+        interpolator.fit(x, y, z + rng.normal(0, 0.001, n_nodes))
+    refit_time = (time.perf_counter() - start) / max(n_refits, 1)
+    return fit_time, refit_time, evaluate_time, peak_memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 2000, 10000])
+    parser.add_argument("--neighbors", type=int, default=50)
+    parser.add_argument("--grid", type=int, default=50)
+    parser.add_argument("--refits", type=int, default=3)
+    parser.add_argument("--max-global", type=int, default=10000, help="skip the global mode above this many nodes")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    print(f"{'nodes':>8} {'mode':>12} {'fit (s)':>10} {'refit (s)':>10} {'eval (s)':>10} {'peak (MB)':>10}")
+    for n_nodes in args.sizes:
+        for mode, neighbors in (("global", None), (f"local k={args.neighbors}", args.neighbors)):
+            if neighbors is None and n_nodes > args.max_global:
+                print(f"{n_nodes:>8} {mode:>12} {'skipped':>10}")
+                continue
+            with context.Pool(1) as pool:
+                fit_time, refit_time, evaluate_time, peak_memory = pool.apply(run_case, (n_nodes, neighbors, args.grid, args.refits, 0))
+            print(f"{n_nodes:>8} {mode:>12} {fit_time:>10.4f} {refit_time:>10.4f} {evaluate_time:>10.4f} {peak_memory / 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import sys
 from py_vol_surface import surface_plotter
 from py_vol_surface import utils
 from py_vol_surface import instruments
@@ -5,10 +6,9 @@ from py_vol_surface.engines.option_engines import black_scholes_merton
 from py_vol_surface.engines.yield_engines import implied_engines
 from py_vol_surface import interpolation_engines
 from examples.bybit import websocket_streamer
-import queue
 
 
-def main():
+def main(process_isolated=False):
     ws_option_url = "wss://stream.bybit.com/v5/public/option"
     ws_spot_url = "wss://stream.bybit.com/v5/public/spot"
 
@@ -20,8 +20,15 @@ def main():
     
     channels, df_options, df_spot, option_underlying_name_map = websocket_streamer.get_bybit_tickers()
 
-    q = queue.Queue()
-    ws = websocket_streamer.Streamer(ws_option_url, ws_spot_url, channels, q)
+    instrument_names = df_options["instrument_name"].to_list() + df_spot["instrument_name"].to_list()
+    if process_isolated:
+        q = utils.SharedQuoteTable(instrument_names) # the streamer runs in its own process and writes quotes into shared memory
+    else:
+        q = utils.TickRingGroup(instrument_names, ["spot", "option"])
+    decoder = None
+    if utils.TickDecoder.available_backends()[0] != "json": # the stdlib backend is no faster than the streamer's own json.loads
+        decoder = utils.TickDecoder(websocket_json_format, payload_path=("data",), field_paths={"timestamp" : ("ts",)})
+    ws = websocket_streamer.Streamer(ws_option_url, ws_spot_url, channels, q, decoder)
 
     starting_price_type="mid"
     
@@ -36,8 +43,8 @@ def main():
                               "timer_process_data" : 0,  # set to 0 since we want process data as soon as timer_ws_response is completed. If websocket_config["timer_ws_response"] = 0, then there will be no buffering in the data processing after each ws response
                              }
     
-    websocket_config = {"parallel_type": "threading",
-                        "ws_transport_method" : "queue",
+    websocket_config = {"parallel_type": "process" if process_isolated else "threading",
+                        "ws_transport_method" : "shared_memory" if process_isolated else "queue",
                         "start_ws_func_name": "start_websocket",
                         "price_generator": ws,
                         "multiple_levels": False,
@@ -74,4 +81,4 @@ def main():
                                  colour_styles_config=colour_styles_config,
                                 )
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main(process_isolated="--process" in sys.argv)
\ No newline at end of file
@@ -7,6 +7,7 @@ import websockets
 from websockets.sync.client import connect
 from typing import Dict
 import queue
+from py_vol_surface import utils
 
 
 def get_bybit_tickers():
@@ -46,7 +47,7 @@ def get_bybit_tickers():
 
 
 class Streamer:
-    def __init__(self, ws_option_url: str, ws_spot_url: str, channels : list, queue: queue.Queue) -> None:
+    def __init__(self, ws_option_url: str, ws_spot_url: str, channels : list, queue: queue.Queue | utils.TickRingGroup | utils.SharedQuoteTable, decoder: utils.TickDecoder=None) -> None:
         super().__init__()
         self.channels = channels
         self.ws_option_url: str = ws_option_url
@@ -58,47 +59,19 @@ class Streamer:
         self.running = False  
         self.last_print = time.time()
         self.spot_orderbook = {}
+        if isinstance(queue, utils.TickRingBuffer):
+            raise ValueError("The spot and option websockets push from separate threads, pass a utils.TickRingGroup with producers ['spot', 'option'] instead of a single TickRingBuffer")
         self.queue=queue
-
-    def _initialise_local_data(self, topic):
-        try:
-            self.spot_orderbook[topic]
-        except KeyError:
-            self.spot_orderbook[topic] = []
+        self.decoder=decoder
 
     def _process_delta_orderbook(self, message, topic):
-        self._initialise_local_data(topic)
+        if not topic in self.spot_orderbook:
+            self.spot_orderbook[topic] = utils.OrderBook()
+        data = message["data"]
         if "snapshot" in message["type"]:
-            self.spot_orderbook[topic] = message["data"]
-            return
-
-        book_sides = {"b": message["data"]["b"], "a": message["data"]["a"]}
-        self.spot_orderbook[topic]["u"]=message["data"]["u"]
-        self.spot_orderbook[topic]["seq"]=message["data"]["seq"]
-
-        for side, entries in book_sides.items():
-            for entry in entries:
-                if float(entry[1]) == 0:
-                    index = _find_index(self.spot_orderbook[topic][side], entry, 0)
-                    self.spot_orderbook[topic][side].pop(index)
-                    continue
-
-                price_level_exists = entry[0] in [
-                    level[0] for level in self.spot_orderbook[topic][side]
-                ]
-                if not price_level_exists:
-                    self.spot_orderbook[topic][side].append(entry)
-                    continue
-
-                qty_changed = entry[1] != next(
-                    level[1]
-                    for level in self.spot_orderbook[topic][side]
-                    if level[0] == entry[0]
-                )
-                if price_level_exists and qty_changed:
-                    index = _find_index(self.spot_orderbook[topic][side], entry, 0)
-                    self.spot_orderbook[topic][side][index] = entry
-                    continue
+            self.spot_orderbook[topic].snapshot(data["b"], data["a"])
+        else:
+            self.spot_orderbook[topic].update(data["b"], data["a"])
 
     def start_websocket(self):
         print("Starting websocket connections")
@@ -111,6 +84,7 @@ class Streamer:
 
             
     def _setup_websocket(self, channels, channel_type, url):
+        sink = self.queue.ring(channel_type) if isinstance(self.queue, utils.TickRingGroup) else self.queue
         with connect(url) as websocket:
             websocket.send(json.dumps({"op" : "subscribe",
                                        "args" : channels}))
@@ -127,6 +101,12 @@ class Streamer:
                 if time.time() - last_heartbeat > 15:
                     websocket.send(json.dumps({"req_id": "100001", "op": "ping"}))
                 
+                if channel_type == "option" and not self.decoder is None:
+                    tick = self.decoder.decode(message)
+                    if not tick is None:
+                        self._put_tick(sink, tick)
+                        continue
+                
                 message: Dict = json.loads(message)
                 
                 if "op" in message:
@@ -136,12 +116,21 @@ class Streamer:
                                 
                 if not "success" in message:
                     processed_data = self._process_message(message, channel_type)
-                    self.queue.put(processed_data)
+                    if hasattr(sink, "push_by_name"):
+                        sink.push_by_name(processed_data["symbol"], processed_data["bidPrice"], processed_data["askPrice"], processed_data["ts"])
+                    else:
+                        sink.put(processed_data)
                 
+    def _put_tick(self, sink, tick):
+        if hasattr(sink, "push_by_name"):
+            sink.push_by_name(tick.instrument_name, tick.bid, tick.ask, tick.timestamp)
+        else:
+            sink.put(tick)
+
     def _process_message(self, message: dict, channel_type: str) -> dict:
         if channel_type == "spot":
             self._process_delta_orderbook(message, message["topic"])
-            return self.process_orderbook_message(message)
+            return self.process_orderbook_message(message, message["topic"])
         else:
             return self.process_ticker_message(message)
         
@@ -157,14 +146,12 @@ class Streamer:
                 sub_msg = json.dumps({"op": "subscribe", "args": [channel]})
                 await websocket.send(sub_msg)
 
-    def process_orderbook_message(self, message):
-        data= list(self.spot_orderbook.values())[0]
-        if not "symbol" in data:
-            data["symbol"] = data.pop("s")
-        data["ts"] = message["ts"] / 1000
-        data["bidPrice"] = float(data["b"][0][0])
-        data["askPrice"] = float(data["a"][0][0])
-        return data
+    def process_orderbook_message(self, message, topic):
+        orderbook = self.spot_orderbook[topic]
+        return {"symbol" : message["data"]["s"],
+                "ts" : message["ts"] / 1000,
+                "bidPrice" : orderbook.best_bid,
+                "askPrice" : orderbook.best_ask}
     
     def process_ticker_message(self, message):
         data=message["data"]    
@@ -185,7 +172,4 @@ class Streamer:
         if self.ws_option:
             self.ws_option.exit() 
         self.quit()  
-        self.wait(2000) 
-
-def _find_index(source, target, key):
-    return next(i for i, j in enumerate(source) if j[key] == target[key])
\ No newline at end of file
+        self.wait(2000) 
\ No newline at end of file
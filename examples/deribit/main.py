@@ -16,7 +16,10 @@ def main():
                                                                   "timestamp")
     channels, df_options, df_futures, df_spot, option_underlying_name_map, future_underlying_name_map = websocket_streamer.generate_option_channels()
     
-    ws = websocket_streamer.Streamer(url, channels, spot_flag=True, future_flag=True)
+    decoder = None
+    if utils.TickDecoder.available_backends()[0] != "json": # the stdlib backend is no faster than the streamer's own json.loads
+        decoder = utils.TickDecoder(websocket_json_format, payload_path=("params", "data"))
+    ws = websocket_streamer.Streamer(url, channels, spot_flag=True, future_flag=True, decoder=decoder)
         
     starting_price_type="mid"
     
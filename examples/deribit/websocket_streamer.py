@@ -150,7 +150,7 @@ def generate_option_channels():
 
 
 class Streamer:
-    def __init__(self, ws_connection_url: str, channels : list, spot_flag: str=True, future_flag: str=True) -> None:
+    def __init__(self, ws_connection_url: str, channels : list, spot_flag: str=True, future_flag: str=True, decoder=None) -> None:
         self.channels = channels
         self.ws_connection_url: str = ws_connection_url
         self.spot_flag=spot_flag
@@ -158,6 +158,9 @@ class Streamer:
         self.option_names = []
         self.future_names = []
         self._reformat_data(channels)
+        self.decoder = decoder
+        self._loads = json.loads if decoder is None else decoder.loads
+        self._typed_names = set(self.future_names)
 
         self.websocket_client: websockets.WebSocketClientProtocol = None
         self.refresh_token: str = None
@@ -202,7 +205,13 @@ class Streamer:
                     print(f"Connection closed with error: {e}")
                     break
                     
-                message: Dict = json.loads(message)
+                if not self.decoder is None:
+                    tick = self.decoder.decode(message)
+                    if not tick is None and tick.instrument_name in self._typed_names:
+                        yield tick
+                        continue
+                    
+                message: Dict = self._loads(message)
 
                 if "params" in message:
                     
@@ -235,6 +244,8 @@ class Streamer:
                                     
 
                                 yield data_synth
+                            else:
+                                self._typed_names.add(instrument_name)
                             
                         yield data
                         continue
@@ -4,6 +4,7 @@ import numpy as np
 from py_vol_surface import utils
 from typing import Any
 import copy
+import itertools
 from py_vol_surface import misc_widgets
 from typing import Dict, ClassVar, Optional
 from py_vol_surface import exceptions
@@ -31,43 +32,20 @@ class Raw:
     valid_price: np.ndarray = field(init=False, default_factory=np.array)
     underlying_price: np.ndarray = field(init=False, default_factory=np.array)
     
-    def __init__(self, n_options):
-        self.n_options = n_options
-        self.ivol = np.full(n_options, np.nan)
-        self.delta = np.full(n_options, np.nan)
-        self.delta_mag = np.full(n_options, np.nan)
-        self.gamma = np.full(n_options, np.nan)
-        self.vega = np.full(n_options, np.nan)
-        self.moneyness = np.full(n_options, np.nan)
-        self.log_moneyness = np.full(n_options, np.nan)
-        self.standardised_moneyness = np.full(n_options, np.nan)
-        self.OTM = np.array([True] * n_options)
-        self.call_flag = np.array([True] * n_options)
-        self.valid_price= np.array([False] * n_options)
-        self.underlying_price = np.full(n_options, np.nan)
-
-    def update_IVOL(self, idx, implied_volatility):
-        self.ivol[idx] = implied_volatility
-    
-    def update_all_metrics(self, idx, jdx, ivol, delta, delta_mag, gamma, vega, moneyness,
-                           log_moneyness, standardised_moneyness, OTM, call_flag, valid_price, underlying_price):
-        self.ivol[idx] = ivol[jdx]
-        self.delta[idx] = delta[jdx]
-        self.delta_mag[idx] = delta_mag[jdx]
-        self.gamma[idx] = gamma[jdx]
-        self.vega[idx] = vega[jdx]
-        self.moneyness[idx] = moneyness
-        self.log_moneyness[idx] = log_moneyness
-        self.standardised_moneyness[idx] = standardised_moneyness[jdx]
-        self.OTM[idx] = OTM
-        self.call_flag[idx] = call_flag
-        self.valid_price[idx]=valid_price
-        self.underlying_price[idx]=underlying_price
-    
-    def update_with_instrument_object(self, idx, option_object, ivol, update_list):
-        self.ivol[idx] = ivol
-        for metric in update_list:    
-            getattr(self, metric)[idx] = getattr(option_object, metric)
+    def __init__(self, option_book, jdx):
+        self.n_options = option_book.n_options
+        self.ivol = option_book.ivol[jdx]
+        self.delta = option_book.delta[jdx]
+        self.delta_mag = option_book.delta_mag[jdx]
+        self.gamma = option_book.gamma[jdx]
+        self.vega = option_book.vega[jdx]
+        self.moneyness = option_book.moneyness
+        self.log_moneyness = option_book.log_moneyness
+        self.standardised_moneyness = option_book.standardised_moneyness[jdx]
+        self.OTM = option_book.OTM
+        self.call_flag = option_book.call_flag
+        self.valid_price = option_book.valid_price
+        self.underlying_price = option_book.underlying_price
        
 
 @dataclass(slots=True, frozen=True)
@@ -90,7 +68,9 @@ class Domain:
     z_mat: np.ndarray = field(init=False, default_factory=lambda: np.array)
 
     xy: np.ndarray = field(init=False, default_factory=lambda: np.array)
-    idx_ij_mapping: Dict[int, tuple] = field(init=False, default_factory=dict)
+    idx_i: np.ndarray = field(init=False, default_factory=lambda: np.array)
+    idx_j: np.ndarray = field(init=False, default_factory=lambda: np.array)
+    idx_mapped: np.ndarray = field(init=False, default_factory=lambda: np.array)
     z_mat: float = field(init=False, default_factory=lambda: np.array)
     
     def __post_init__(self):
@@ -107,19 +87,19 @@ class Domain:
         self.x_mat, self.y_mat = np.meshgrid(self.x_vect, self.y_vect, indexing="xy")
         self.z_mat = np.full(self.x_mat.shape, np.nan)
         
-        self.idx_ij_mapping = {}
-        
-        for i in range(self.x_mat.shape[0]):
-            for j in range(self.x_mat.shape[1]):
-                match_idx = np.where((self.xy == [self.x_mat[i, j], self.y_mat[i, j]]).all(axis=1))[0]
-                for idx in match_idx:
-                    self.idx_ij_mapping[idx] = (i, j)
+        self.idx_i = np.searchsorted(self.y_vect, self.y)
+        self.idx_j = np.searchsorted(self.x_vect, self.x)
+        self.idx_mapped = ((self.idx_i < self.y_vect.size)
+                           & (self.idx_j < self.x_vect.size)
+                           & (self.y_vect[np.minimum(self.idx_i, self.y_vect.size - 1)] == self.y)
+                           & (self.x_vect[np.minimum(self.idx_j, self.x_vect.size - 1)] == self.x)
+                           )
 
     def update_data(self, z, idx_map):
-        for idx, ivol in zip(idx_map, z):
-            if idx in self.idx_ij_mapping:
-                i, j = self.idx_ij_mapping[idx]
-                self.z_mat[i,j] = ivol
+        idx_map = np.asarray(idx_map, dtype=int)
+        mapped = self.idx_mapped[idx_map]
+        idx_map = idx_map[mapped]
+        self.z_mat[self.idx_i[idx_map], self.idx_j[idx_map]] = np.asarray(z)[mapped]
 
 
     def switch_axis(self):
@@ -296,6 +276,86 @@ class Surface:
         self.valid_values=True
 
 
+def _read_only_copy(arr, dtype=float):
+    arr = np.array(arr, dtype=dtype, copy=True)
+    arr.flags.writeable = False
+    return arr
+
+
+@dataclass(slots=True, frozen=True)
+class OptionBookSnapshot:
+    bid: np.ndarray
+    ask: np.ndarray
+    mid: np.ndarray
+    ivol: np.ndarray
+    OTM: np.ndarray
+    
+    @classmethod
+    def from_option_book(cls, option_book):
+        return cls(_read_only_copy(option_book.bid),
+                   _read_only_copy(option_book.ask),
+                   _read_only_copy(option_book.mid),
+                   _read_only_copy(option_book.ivol),
+                   _read_only_copy(option_book.OTM, dtype=bool))
+
+
+@dataclass(slots=True, frozen=True)
+class PlotSnapshot:
+    x: np.ndarray
+    y: np.ndarray
+    z: np.ndarray
+    valid_values: bool
+    
+    @classmethod
+    def from_plot_data(cls, plot_data):
+        return cls(_read_only_copy(plot_data.x),
+                   _read_only_copy(plot_data.y),
+                   _read_only_copy(plot_data.z),
+                   plot_data.valid_values)
+
+
+@dataclass(slots=True, frozen=True)
+class SurfaceSnapshot:
+    price_type: str
+    version: int
+    scatter: PlotSnapshot
+    surface: PlotSnapshot
+    z_mat: np.ndarray
+    limits: tuple
+    interpolator: Any
+
+    @classmethod
+    def from_container(cls, data_container):
+        limits = tuple(getattr(data_container, f"{axis}_{lim}", np.nan) for axis in ("x", "y", "z") for lim in ("min", "max"))
+        return cls(data_container.price_type,
+                   data_container.version,
+                   PlotSnapshot.from_plot_data(data_container.scatter),
+                   PlotSnapshot.from_plot_data(data_container.surface),
+                   _read_only_copy(data_container.domain.z_mat),
+                   limits,
+                   copy.copy(data_container.surface.interpolator))
+
+    def get_limits(self):
+        return self.limits
+
+
+@dataclass(slots=True, frozen=True)
+class DataSnapshot:
+    version: int
+    objects: dict
+    x_min: float
+    x_max: float
+    y_min: float
+    y_max: float
+    z_min: float
+    z_max: float
+    valid_values_any: bool
+    option_book: Optional[OptionBookSnapshot] = None
+    
+    def get_limits(self):
+        return self.x_min, self.x_max, self.y_min, self.y_max, self.z_min, self.z_max
+
+
 @dataclass
 class Smirk:
     domain: Domain
@@ -316,7 +376,10 @@ class DataContainer:
     scatter: Optional["Scatter"] = None
     surface: Optional["Surface"] = None
     domain: Optional["Domain"] = None
+    version: int = field(init=False, default=0)
     base_domain: ClassVar[BaseDomain]
+    _version_counter: ClassVar = itertools.count(1)
+    _snapshot: Optional["SurfaceSnapshot"] = field(init=False, default=None, repr=False)
     
     def __post_init__(self):
         if not self.scatter is None and not self.surface is None:
@@ -328,6 +391,12 @@ class DataContainer:
         self.domain.update_data(z, idx_map)
         self.surface.interpolate_surface()
         self._calculate_data_limits()
+        self.version = next(self._version_counter)
+    
+    def snapshot(self):
+        if self._snapshot is None or self._snapshot.version != self.version:
+            self._snapshot = SurfaceSnapshot.from_container(self)
+        return self._snapshot
     
     def _calculate_data_limits(self):
         self.x_min = np.minimum(self.scatter.x_min, self.surface.x_min)
@@ -347,11 +416,8 @@ class DataContainer:
         
     def create_from_scratch(self, n_options, price_type, instrument_manager, axis_transformer, interpolation_config, colour_config):
         self.price_type = price_type
-        self.raw = Raw(n_options)
-        for option_name, option_object in instrument_manager.options.items():
-            idx = instrument_manager.options_maps.name_index_map[option_name]
-            jdx = option_object.price_type_idx_map[price_type]
-            self.raw.update_all_metrics(idx, jdx, *option_object.get_all_metrics(), option_object.valid_price) 
+        option_book = instrument_manager.option_book
+        self.raw = Raw(option_book, option_book.price_type_idx_map[price_type])
         
         x, y, z, idx_map = axis_transformer.transform_data(self.raw)
         
@@ -364,6 +430,7 @@ class DataContainer:
         self.domain = Domain(self.base_domain)
         
         self._calculate_data_limits()
+        self.version = next(self._version_counter)
         return self        
 
 
@@ -459,12 +526,17 @@ class DataContainerManager:
     z_max: float = field(init=False, default=np.nan)
 
     features: DataFeatureManager = None
+    option_book: Any = None
+    snapshot: Optional[DataSnapshot] = field(init=False, default=None)
+    version: int = field(init=False, default=0)
 
     def __post_init__(self, price_types, data_container: DataContainer):
         self.features = DataFeatureManager(price_types)
         
         if not data_container is None:
             self.add_container(data_container)
+        else:
+            self.publish()
             
     def add_container(self, data_container):
         self.objects[data_container.price_type] = data_container
@@ -478,6 +550,8 @@ class DataContainerManager:
     def process_update(self):
         if len(self.objects) > 0:
             self.calculate_data_limits()
+        else:
+            self.publish()
         
     def calculate_data_limits(self):
         if len(self.objects) > 0:
@@ -493,6 +567,15 @@ class DataContainerManager:
         else:
             self.x_min, self.x_max, self.y_min, self.y_max, self.z_min, self.z_max = [np.nan] * 6
             self.valid_values_any=False
+        self.publish()
+    
+    def publish(self):
+        self.version += 1
+        self.snapshot = DataSnapshot(self.version,
+                                     {price_type : data_container.snapshot() for price_type, data_container in self.objects.items()},
+                                     *self.get_limits(),
+                                     len(self.objects) > 0 and self.features.valid_values_any,
+                                     None if self.option_book is None else OptionBookSnapshot.from_option_book(self.option_book))
             
     def get_limits(self):
         return self.x_min, self.x_max, self.y_min, self.y_max, self.z_min, self.z_max
@@ -19,6 +19,7 @@ def update_config(config):
                                          }
     _check_option_config(config)
     _check_yield_configs(config)
+    _check_interpolation_config(config)
 
 
 def _check_data_config(config):
@@ -49,3 +50,12 @@ def _check_option_config(config):
     pass
 
 
+def _check_interpolation_config(config):
+    interpolation_config = config["interpolation_config"]
+    if interpolation_config.get("mode", "global") == "local":
+        engine = interpolation_config["engine"]
+        if not callable(getattr(engine, "set_neighbors", None)):
+            raise ValueError(f"interpolation_config mode 'local' requires an engine with set_neighbors (e.g. CustomRBFInterpolator), got {type(engine).__name__}")
+        engine.set_neighbors(interpolation_config.get("neighbors", 50))
+
+
@@ -1,4 +1,11 @@
 from ... import utils
+import numpy as np
+from scipy.special import ndtr
+from dataclasses import dataclass, fields
+
+
+_INV_SQRT_2PI = 1 / np.sqrt(2 * np.pi)
+
 
 class BaseEngine:
     def __init__(self, strike, expiry, flag_str, flag_int=None, interest_rate_engine=None, dividend_rate_engine=None):
@@ -51,3 +58,158 @@ class BaseEngine:
                                      self.flag_int,
                                      q=q
                                     )
+
+    @staticmethod
+    def _batch_parameters(engines, yte=None):
+        n_engines = len(engines)
+        strike = np.fromiter((engine.strike for engine in engines), dtype=float, count=n_engines)
+        if yte is None:
+            expiry = np.fromiter((engine.expiry for engine in engines), dtype=float, count=n_engines)
+            yte = utils.convert_unix_maturity_to_years(expiry)
+        yte = np.asarray(yte, dtype=float)
+        r = BaseEngine._evaluate_rate_engines([engine.interest_rate_engine for engine in engines], yte)
+        q = BaseEngine._evaluate_rate_engines([None if engine._dividend_off else engine.dividend_rate_engine for engine in engines], yte)
+        return strike, yte, r, q
+
+    @staticmethod
+    def _evaluate_rate_engines(rate_engines, yte):
+        rates = np.zeros(yte.shape)
+        engine_positions = {}
+        for position, rate_engine in enumerate(rate_engines):
+            if not rate_engine is None:
+                engine_positions.setdefault(id(rate_engine), (rate_engine, []))[1].append(position)
+        for rate_engine, positions in engine_positions.values():
+            rates[positions] = rate_engine.evaluate(yte[positions])
+        return rates
+
+    @staticmethod
+    def calculate_IVOL_batch(engines, option_prices, underlying_prices, yte=None):
+        option_prices = np.asarray(option_prices, dtype=float)
+        if len(engines) == 0:
+            return np.empty(option_prices.shape)
+        n_price_types = option_prices.shape[0]
+        strike, yte, r, q = BaseEngine._batch_parameters(engines, yte)
+        flag_str = np.array([engine.flag_str for engine in engines])
+
+        ivol = engines[0].IVOL_engine(option_prices.ravel(),
+                                      np.tile(np.asarray(underlying_prices, dtype=float), n_price_types),
+                                      np.tile(strike, n_price_types),
+                                      np.tile(yte, n_price_types),
+                                      np.tile(r, n_price_types),
+                                      np.tile(flag_str, n_price_types),
+                                      q=np.tile(q, n_price_types)
+                                      )
+        return np.asarray(ivol, dtype=float).reshape(option_prices.shape)
+
+    @staticmethod
+    def calculate_all_greeks_batch(engines, IVOL, underlying_prices, out=None, yte=None):
+        strike, yte, r, q = BaseEngine._batch_parameters(engines, yte)
+        flag_int = np.fromiter((engine.flag_int for engine in engines), dtype=float, count=len(engines))
+        return engines[0].greek_engine_all(IVOL,
+                                           np.asarray(underlying_prices, dtype=float),
+                                           strike,
+                                           yte,
+                                           r,
+                                           flag_int,
+                                           q=q,
+                                           out=out
+                                           )
+
+
+@dataclass(slots=True)
+class GreeksBuffer:
+    delta: np.ndarray
+    gamma: np.ndarray
+    vega: np.ndarray
+    theta: np.ndarray
+    rho: np.ndarray
+    sqrt_t: np.ndarray
+    sigma_sqrt_t: np.ndarray
+    d1: np.ndarray
+    d2: np.ndarray
+    pdf_d1: np.ndarray
+    cdf_d1: np.ndarray
+    cdf_d2: np.ndarray
+    discount_r: np.ndarray
+    discount_q: np.ndarray
+    scratch: np.ndarray
+    
+    @classmethod
+    def empty(cls, shape):
+        return cls(*(np.empty(shape) for _ in fields(cls)))
+    
+    def view(self, n):
+        return GreeksBuffer(*(getattr(self, buffer_field.name)[..., :n] for buffer_field in fields(self)))
+    
+    def greeks(self):
+        return self.delta, self.gamma, self.vega, self.theta, self.rho
+
+
+def fused_greeks(sigma, S, K, t, r, q, flag, out=None):
+    """
+    Shared single pass for the generalised Black-Scholes greeks, where q is the continuous yield of the underlying
+    (q=r gives Black-76). d1, d2, the normal pdf/cdf and both discount factors are evaluated once and every
+    intermediate is written into the buffers of out, so a preallocated GreeksBuffer makes the call allocation free.
+    rho is left to the caller as it depends on the model.
+    """
+    if out is None:
+        out = GreeksBuffer.empty(np.broadcast_shapes(*(np.shape(arg) for arg in (sigma, S, K, t, r, q, flag))))
+    
+    np.sqrt(t, out=out.sqrt_t)
+    np.multiply(sigma, out.sqrt_t, out=out.sigma_sqrt_t)
+    
+    np.divide(S, K, out=out.d1)
+    np.log(out.d1, out=out.d1)
+    np.subtract(r, q, out=out.scratch)
+    out.scratch *= t
+    out.d1 += out.scratch
+    np.multiply(out.sigma_sqrt_t, out.sigma_sqrt_t, out=out.scratch)
+    out.scratch *= 0.5
+    out.d1 += out.scratch
+    out.d1 /= out.sigma_sqrt_t
+    np.subtract(out.d1, out.sigma_sqrt_t, out=out.d2)
+    
+    np.multiply(out.d1, out.d1, out=out.pdf_d1)
+    out.pdf_d1 *= -0.5
+    np.exp(out.pdf_d1, out=out.pdf_d1)
+    out.pdf_d1 *= _INV_SQRT_2PI
+    np.multiply(flag, out.d1, out=out.cdf_d1)
+    ndtr(out.cdf_d1, out=out.cdf_d1)
+    np.multiply(flag, out.d2, out=out.cdf_d2)
+    ndtr(out.cdf_d2, out=out.cdf_d2)
+    
+    np.multiply(r, t, out=out.discount_r)
+    np.negative(out.discount_r, out=out.discount_r)
+    np.exp(out.discount_r, out=out.discount_r)
+    np.multiply(q, t, out=out.discount_q)
+    np.negative(out.discount_q, out=out.discount_q)
+    np.exp(out.discount_q, out=out.discount_q)
+    
+    # delta = flag * e^(-qt) * N(flag * d1)
+    np.multiply(flag, out.discount_q, out=out.delta)
+    out.delta *= out.cdf_d1
+    
+    # vega = S * e^(-qt) * n(d1) * sqrt(t)
+    np.multiply(S, out.discount_q, out=out.vega)
+    out.vega *= out.pdf_d1
+    
+    # theta = -S e^(-qt) n(d1) sigma / (2 sqrt(t)) + flag q S e^(-qt) N(flag d1) - flag r K e^(-rt) N(flag d2)
+    np.multiply(out.vega, sigma, out=out.theta)
+    out.theta /= out.sqrt_t
+    out.theta *= -0.5
+    np.multiply(out.delta, S, out=out.scratch)
+    out.scratch *= q
+    out.theta += out.scratch
+    np.multiply(flag, K, out=out.scratch)
+    out.scratch *= r
+    out.scratch *= out.discount_r
+    out.scratch *= out.cdf_d2
+    out.theta -= out.scratch
+    
+    # gamma = e^(-qt) * n(d1) / (S * sigma * sqrt(t))
+    np.divide(out.vega, S, out=out.gamma)
+    out.gamma /= S
+    out.gamma /= out.sigma_sqrt_t
+    
+    out.vega *= out.sqrt_t
+    return out
@@ -57,15 +57,15 @@ class Engine(base.BaseEngine):
             return C - (F - K) * np.exp(- r*t)
 
     @staticmethod
-    def get_all_greeks(sigma, F, K, t, r, flag, **kwargs):
-        d1 = (np.log(F/K) + 0.5 * t * sigma**2) / (sigma*np.sqrt(t))
-        d2 = d1 - np.sqrt(t)
+    def get_all_greeks(sigma, F, K, t, r, flag, out=None, **kwargs):
+        out = base.fused_greeks(sigma, F, K, t, r, r, flag, out=out)
         
-        delta=flag * np.exp(-r*t)*norm.cdf(flag*d1, 0, 1)
-        gamma=np.exp(-r * t) * norm.cdf(d1, 0, 1) / (F * sigma * np.sqrt(t))
-        vega=F * np.exp(-r*t) * norm.cdf(d1, 0, 1) * np.sqrt(t)
-        theta= - F * np.exp(-r*t) * norm.pdf(d1, 0, 1) * sigma / (2 * np.sqrt(t)) \
-                - flag * r * K *np.exp(-r*t) * norm.cdf(flag*d2) + flag* r * F * np.exp(-r*t) * norm.cdf(flag*d1, 0, 1)
-        rho = -t * flag * (F * norm.cdf(flag *sigma, 0,) - K * norm.cdf(flag*d2, 0, 1))
-        return delta, gamma, vega, theta, rho
-
+        # rho = -t * e^(-rt) * flag * (F N(flag d1) - K N(flag d2))
+        np.multiply(F, out.cdf_d1, out=out.rho)
+        np.multiply(K, out.cdf_d2, out=out.scratch)
+        out.rho -= out.scratch
+        out.rho *= flag
+        out.rho *= out.discount_r
+        out.rho *= t
+        np.negative(out.rho, out=out.rho)
+        return out.greeks()
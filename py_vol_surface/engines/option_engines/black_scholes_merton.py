@@ -60,16 +60,14 @@ class Engine(base.BaseEngine):
             raise ValueError("Either C or P must be provided")
 
     @staticmethod
-    def get_all_greeks(sigma, S, K, t, r, flag, q=0, **kwargs):
-        d1 = (np.log(S/K) + (r - q + 0.5 * sigma**2) * t) / (sigma * np.sqrt(t))
-        d2 = d1 - sigma * np.sqrt(t)
+    def get_all_greeks(sigma, S, K, t, r, flag, q=0, out=None, **kwargs):
+        if q is None:
+            q = 0
+        out = base.fused_greeks(sigma, S, K, t, r, q, flag, out=out)
         
-        delta = flag * np.exp(-q * t) * norm.cdf(flag * d1)
-        gamma = np.exp(-q * t) * norm.pdf(d1) / (S * sigma * np.sqrt(t))
-        vega = S * np.exp(-q * t) * norm.pdf(d1) * np.sqrt(t)
-        theta = - (S * np.exp(-q * t) * norm.pdf(d1) * sigma) / (2 * np.sqrt(t)) \
-                + flag * q * S * np.exp(-q * t) * norm.cdf(flag * d1)\
-                - flag * r * K * np.exp(-r * t) * norm.cdf(flag * d2)\
-                
-        rho = flag * K * t * np.exp(-r * t) * norm.cdf(flag * d2)
-        return delta, gamma, vega, theta, rho
\ No newline at end of file
+        # rho = flag * K * t * e^(-rt) * N(flag d2)
+        np.multiply(flag, K, out=out.rho)
+        out.rho *= t
+        out.rho *= out.discount_r
+        out.rho *= out.cdf_d2
+        return out.greeks()
@@ -13,15 +13,79 @@ def implied_forward_rate(F_1, F_2, T_1, T_2):
     return math.log(F_2 / F_1) / (T_2 - T_1)
 
 def implied_q_from_futures(F, S, T, r):
-    return r - math.log(F / S)/T
+    return r - np.log(F / S)/T
 
 def implied_r_from_futures(F, S, T, q):
-    return q + math.log(F / S)/T
+    return q + np.log(F / S)/T
 
 def get_implied_from_PC_black(C, P, F, K, T):
     return - math.log((C-P) / (F - K)) / T
 
-class ImpliedFromFuture:
+
+class BaseYieldEngine:
+    """
+    Holds the fitted yield curve y(t) together with its antiderivative, so the rate for a maturity T,
+    the mean of y over [t_0, T], is (Y(T) - Y(t_0)) / (T - t_0). Rates are cached per maturity until
+    the next fit or the next tick of the year-fraction clock.
+    """
+    _degenerate_tol = 1e-10
+    
+    def _reset_curve(self):
+        self.interpolator = None
+        self.antiderivative = None
+        self._rate_cache = {}
+        self._cache_key = None
+    
+    def _fit_curve(self, x, y):
+        if x.size > 2:
+            if np.all(np.diff(y) >= 0):
+                self.interpolator = PchipInterpolator(x, y)
+            else:
+                self.interpolator = make_interp_spline(x, y, k=2)
+            self.antiderivative = self.interpolator.antiderivative()
+        else:
+            self.interpolator = None
+            self.antiderivative = None
+        self._rate_cache = {}
+        self._cache_key = None
+    
+    def _integration_start(self):
+        return 0.
+    
+    def _average_rate(self, yte):
+        if self.interpolator is None:
+            return np.zeros(yte.shape)
+        t_0 = self._integration_start()
+        span = yte - t_0
+        degenerate = np.abs(span) < self._degenerate_tol
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rates = (self.antiderivative(yte) - self.antiderivative(t_0)) / span
+        if degenerate.any():
+            rates[degenerate] = self.interpolator(yte[degenerate])
+        return rates
+        
+    def evaluate(self, yte):
+        cache_key = (utils.year_fraction_clock.now, utils.year_fraction_clock.seconds_per_year)
+        if self._cache_key != cache_key:
+            self._rate_cache = {}
+            self._cache_key = cache_key
+        
+        if np.ndim(yte) == 0:
+            yte = float(yte)
+            if not yte in self._rate_cache:
+                self._rate_cache[yte] = float(self._average_rate(np.array([yte]))[0])
+            return self._rate_cache[yte]
+        
+        yte = np.asarray(yte, dtype=float)
+        unique_yte, inverse = np.unique(yte, return_inverse=True)
+        unique_list = unique_yte.tolist()
+        missing = [t for t in unique_list if not t in self._rate_cache]
+        if len(missing) > 0:
+            self._rate_cache.update(zip(missing, self._average_rate(np.array(missing)).tolist()))
+        unique_rates = np.fromiter((self._rate_cache[t] for t in unique_list), dtype=float, count=len(unique_list))
+        return unique_rates[inverse.ravel()].reshape(yte.shape)
+
+class ImpliedFromFuture(BaseYieldEngine):
     def __init__(self, model_type, instrument_manager, bid_key="bid", ask_key="ask", given_rate_engine=None):
         self.bid_key=bid_key
         self.ask_key=ask_key
@@ -30,15 +94,15 @@ class ImpliedFromFuture:
         self.given_rate_engine=given_rate_engine
         self.instrument_to_idx_map={}
         self.spot_future_name_map={}
-        self.mean_discretisation_steps=20
-        self._null_arr = np.array([0] * self.mean_discretisation_steps)
-        self.interpolator = lambda x: self._null_arr 
+        self.spot_to_idx_map={}
         self._expiry_min = None
+        self._dirty = False
+        self._reset_curve()
 
         if self.model_type == "black":
             self.calculate_implied_yield = implied_r_from_futures
         elif self.model_type == "black_scholes_merton":
-            self.calculate_implied_yield = implied_q_from_PC_BSM    
+            self.calculate_implied_yield = implied_q_from_futures
         
         if given_rate_engine is None:
             self.given_rate_engine=DummyYieldClass()
@@ -53,6 +117,7 @@ class ImpliedFromFuture:
         self.mid_arr = np.nan * np.empty(self._n_future)
         self.imp_rate = np.nan * np.empty(self._n_future)   
         self.spot_arr = np.nan * np.empty(self._n_future)   
+        self.future_spot_idx = np.empty(self._n_future, dtype=int)
         
         for idx, (instrument_name, instrument_object) in enumerate(self.instrument_manager.futures.items()):
             self.instrument_to_idx_map[instrument_name] = idx
@@ -61,158 +126,171 @@ class ImpliedFromFuture:
                 self.spot_future_name_map[spot_name].append(instrument_name)
             else:
                 self.spot_future_name_map[spot_name] = [instrument_name]
+                self.spot_to_idx_map[spot_name] = len(self.spot_to_idx_map)
+            self.future_spot_idx[idx] = self.spot_to_idx_map[spot_name]
             self.expiry_arr[idx] = float(instrument_object.expiry)
             if self._expiry_min is None:
                 self._expiry_min = instrument_object.expiry
             else:
                 if instrument_object.expiry < self._expiry_min:
                     self._expiry_min=instrument_object.expiry
+        self.spot_mid_arr = np.nan * np.empty(len(self.spot_to_idx_map))
                     
     def update_data(self, websocket_responses):
         for instrument_name, price_dict in websocket_responses.items():
             self._internal_updater(instrument_name, price_dict[self.bid_key], price_dict[self.ask_key])
 
     def _internal_updater(self, instrument_name, bid_price, ask_price):
-        
         asset_object=self.instrument_manager.all_instrument_objects[instrument_name]
         asset_object.update_price(bid_price, ask_price, callbacks=False)
         if instrument_name in self.instrument_to_idx_map:
-            idx = self.instrument_to_idx_map[instrument_name]
-            yte = utils.convert_unix_maturity_to_years(asset_object.expiry)
-            self.imp_rate[idx] = self.calculate_implied_yield(asset_object.mid,
-                                                            asset_object.underlying_object.mid,
-                                                            yte,
-                                                            self.given_rate_engine.evaluate(yte))
-        if instrument_name in self.spot_future_name_map:
-            for future_names in self.spot_future_name_map[instrument_name]:
-                future_object=self.instrument_manager.all_instrument_objects[future_names]
-                idx = self.instrument_to_idx_map[future_names]
-                yte = utils.convert_unix_maturity_to_years(future_object.expiry)
-                self.imp_rate[idx] = self.calculate_implied_yield(future_object.mid,
-                                                                future_object.underlying_object.mid,
-                                                                yte,
-                                                                self.given_rate_engine.evaluate(yte))
-
-                
-                
-                
-    def fit(self):
+            self._set_mid(self.mid_arr, self.instrument_to_idx_map[instrument_name], asset_object.mid)
+        if instrument_name in self.spot_to_idx_map:
+            self._set_mid(self.spot_mid_arr, self.spot_to_idx_map[instrument_name], asset_object.mid)
+
+    def _set_mid(self, mid_arr, idx, mid):
+        if not (mid == mid_arr[idx] or (np.isnan(mid) and np.isnan(mid_arr[idx]))):
+            mid_arr[idx] = mid
+            self._dirty = True
+    
+    def calculate_implied_rates(self):
         yte = utils.convert_unix_maturity_to_years(self.expiry_arr)
+        self.spot_arr = self.spot_mid_arr[self.future_spot_idx]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.imp_rate = self.calculate_implied_yield(self.mid_arr, self.spot_arr, yte, self.given_rate_engine.evaluate(yte))
+        self.imp_rate[~np.isfinite(self.imp_rate)] = np.nan
+        return yte
+    
+    def fit(self):
+        if not self._dirty:
+            return
+        self._dirty = False
+        yte = self.calculate_implied_rates()
         x, y = utils.filter_nans_2D(yte, self.imp_rate)
-        if x.size > 2:
-            if np.all(np.diff(self.imp_rate) >= 0):
-                self.interpolator = PchipInterpolator(x, y)
-            else:
-                self.interpolator = make_interp_spline(x, y, k=2)
-        else:
-            self.interpolator = lambda x: self._null_arr
+        sort_idx = np.argsort(x)
+        self._fit_curve(x[sort_idx], y[sort_idx])
         
-    def evaluate(self, yte):
-        xi = np.linspace(utils.convert_unix_maturity_to_years(self._expiry_min), yte, 20)
-        return self.interpolator(xi).sum() / 20
+    def _integration_start(self):
+        return utils.convert_unix_maturity_to_years(self._expiry_min)
         
 
-class ImpliedFromOption:
+class ImpliedFromOption(BaseYieldEngine):
+    """
+    Estimates the forward F and discount factor D of every expiry from put-call parity over all matched
+    strikes, C - P = D*F - D*K, by a Huber-weighted IRLS regression of C - P on K solved for all expiries
+    in one batched 2x2 solve. Black takes r from D, Black-Scholes-Merton takes q from the intercept D*F.
+    """
+    huber_k = 1.345
+    max_iter = 10
+    weight_tol = 1e-4
+    
     def __init__(self, model_type, instrument_manager=None, bid_key="bid", ask_key="ask"):
-        if model_type == "black":
-            self.calculate_implied_yield = get_implied_from_PC_black
-        elif model_type == "black_scholes_merton":
-            self.calculate_implied_yield = implied_q_from_PC_BSM
-
+        if not model_type in ["black", "black_scholes_merton"]:
+            raise ValueError(f"Unknown model type {model_type}, must be 'black' or 'black_scholes_merton'")
+        self.model_type=model_type
         self.instrument_manager=instrument_manager        
-        self.exp_yield = {}
-        self.expiry_option_pair_map = {}
-        self.expiry_opt_list_map = {}
         self.bid_key=bid_key
         self.ask_key=ask_key
-        self._find_mid_strike()
-        self.mean_discretisation_steps=20
-        self._null_arr = np.array([0] * self.mean_discretisation_steps)
+        self._reset_curve()
+        self._create_pair_index()
     
-    def _find_mid_strike(self,):
-        strikes = []
-        for option_object in self.instrument_manager.options.values():
-            strikes.append(option_object.strike)
-        self._median_strike = np.median(strikes)
+    def _create_pair_index(self):
+        name_index_map = self.instrument_manager.options_maps.name_index_map
+        call_idx, put_idx = [], []
+        for opt1_name, opt2_name in self.instrument_manager.options_maps.put_call_map.items():
+            if self.instrument_manager.options[opt1_name].flag_int == 1:
+                call_idx.append(name_index_map[opt1_name])
+                put_idx.append(name_index_map[opt2_name])
+        call_idx, put_idx = np.array(call_idx, dtype=int), np.array(put_idx, dtype=int)
+        
+        option_book = self.instrument_manager.option_book
+        self.expiries, pair_expiry_idx = np.unique(option_book.expiry[call_idx], return_inverse=True)
+        n_expiries = self.expiries.size
+        n_pairs_per_expiry = np.bincount(pair_expiry_idx, minlength=n_expiries)
+        max_pairs = n_pairs_per_expiry.max() if n_expiries > 0 else 0
+        
+        order = np.argsort(pair_expiry_idx, kind="stable")
+        rank = np.arange(call_idx.size) - np.repeat(np.cumsum(n_pairs_per_expiry) - n_pairs_per_expiry, n_pairs_per_expiry)
+        self.pair_mask = np.zeros((n_expiries, max_pairs), dtype=bool)
+        self.pair_call_idx = np.zeros((n_expiries, max_pairs), dtype=int)
+        self.pair_put_idx = np.zeros((n_expiries, max_pairs), dtype=int)
+        self.pair_mask[pair_expiry_idx[order], rank] = True
+        self.pair_call_idx[pair_expiry_idx[order], rank] = call_idx[order]
+        self.pair_put_idx[pair_expiry_idx[order], rank] = put_idx[order]
+        
+        self.expiry_underlying_objects = [None] * n_expiries
+        for expiry_idx, jdx in zip(pair_expiry_idx[order], call_idx[order]):
+            if self.expiry_underlying_objects[expiry_idx] is None:
+                option_name = self.instrument_manager.options_maps.index_name_map[jdx]
+                self.expiry_underlying_objects[expiry_idx] = self.instrument_manager.options[option_name].underlying_object
+        
+        self.forward = np.full(n_expiries, np.nan)
+        self.discount = np.full(n_expiries, np.nan)
+        self.imp_yield = np.full(n_expiries, np.nan)
+        
+    def _regression_inputs(self):
+        option_book = self.instrument_manager.option_book
+        call_idx, put_idx = self.pair_call_idx, self.pair_put_idx
+        y = option_book.mid[call_idx] - option_book.mid[put_idx]
+        K = option_book.strike[call_idx]
+        spread = (option_book.ask[call_idx] - option_book.bid[call_idx]) + (option_book.ask[put_idx] - option_book.bid[put_idx])
+        valid = self.pair_mask & option_book.valid_price[call_idx] & option_book.valid_price[put_idx] & np.isfinite(y)
+        base_weights = np.where(np.isfinite(spread) & (spread > 0), 1 / spread, 1.)
+        base_weights = np.where(valid, base_weights, 0.)
+        return np.where(valid, y, 0.), np.where(valid, K, 0.), base_weights
     
-    def _find_closest_option(self, option_name_list):
-        def _finding(option_name_list, default_val=None):
-            smallest_abs_diff = 1e10
-            smallest_diff_instrument_name = None
-            for option_name in option_name_list:
-                option_object = self.instrument_manager.options[option_name]
-                if default_val:
-                    abs_diff = abs(option_object.strike - default_val)
-                else: 
-                    abs_diff = abs(option_object.strike - option_object.underlying_object.mid) 
-                if abs_diff < smallest_abs_diff:
-                    smallest_abs_diff = abs_diff 
-                    smallest_diff_instrument_name = option_name
-            return smallest_diff_instrument_name
-        smallest_diff_instrument_name = _finding(option_name_list)
-        if smallest_diff_instrument_name is None:
-            smallest_diff_instrument_name = _finding(option_name_list, self._median_strike)
-        return smallest_diff_instrument_name
+    @staticmethod
+    def _weighted_line_fit(y, K, weights):
+        A = np.empty((y.shape[0], 2, 2))
+        A[:, 0, 0] = weights.sum(axis=1)
+        A[:, 0, 1] = A[:, 1, 0] = (weights * K).sum(axis=1)
+        A[:, 1, 1] = (weights * K * K).sum(axis=1)
+        b = np.stack(((weights * y).sum(axis=1), (weights * K * y).sum(axis=1)), axis=1)
+        
+        solvable = np.abs(np.linalg.det(A)) > 1e-12 * np.maximum(A[:, 0, 0] * A[:, 1, 1], 1e-300)
+        A[~solvable] = np.eye(2)
+        coeffs = np.linalg.solve(A, b[..., None])[..., 0]
+        coeffs[~solvable] = np.nan
+        return coeffs[:, 0], coeffs[:, 1]
     
-    def _create_constructor(self):
-        for opt1_name, opt2_name in self.instrument_manager.options_maps.put_call_map.items():
-            option_object1 = self.instrument_manager.options[opt1_name]
-            expiry = option_object1.expiry
-            
-            if expiry in self.expiry_opt_list_map:
-                list_for_specific_expiry = self.expiry_opt_list_map[expiry]
-                if not opt2_name in list_for_specific_expiry:    # checking if the put or call with same expiry and maturity is already in dict.
-                    self.expiry_opt_list_map[expiry].append(opt1_name)
-            else:
-                self.expiry_opt_list_map[expiry] = [opt1_name]
+    def fit_parity(self):
+        y, K, base_weights = self._regression_inputs()
+        weights = base_weights
+        for _ in range(self.max_iter):
+            intercept, slope = self._weighted_line_fit(y, K, weights)
+            residuals = np.where(base_weights > 0, y - intercept[:, None] - slope[:, None] * K, np.nan)
+            abs_residuals = np.abs(residuals)
+            has_residuals = np.isfinite(abs_residuals).any(axis=1)
+            scale = np.full(abs_residuals.shape[0], np.nan)
+            scale[has_residuals] = 1.4826 * np.nanmedian(abs_residuals[has_residuals], axis=1)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                u = abs_residuals / scale[:, None]
+                huber_weights = np.where(u <= self.huber_k, 1., self.huber_k / u)
+            new_weights = np.where(np.isfinite(huber_weights), base_weights * huber_weights, base_weights)
+            converged = np.max(np.abs(new_weights - weights), initial=0) <= self.weight_tol * max(np.max(base_weights, initial=0), 1e-300)
+            weights = new_weights
+            if converged:
+                break
         
-        self.expiry_opt_list_map = {key: self.expiry_opt_list_map[key] for key in sorted(self.expiry_opt_list_map)}
+        discount = -slope
+        discount[~(discount > 0)] = np.nan
+        self.discount = discount
+        self.forward = intercept / discount
+        return intercept
         
-        for expiry, option_name_list in self.expiry_opt_list_map.items():
-            smallest_diff_instrument_name = self._find_closest_option(option_name_list)
-            
-            if not smallest_diff_instrument_name is None:
-                smallest_option_object = self.instrument_manager.options[smallest_diff_instrument_name]
-                
-                if smallest_option_object.flag_int == 1:
-                    call_object = smallest_option_object
-                    put_name = self.instrument_manager.options_maps.put_call_map[call_object.instrument_name]
-                    put_object = self.instrument_manager.options[put_name]
-                else:
-                    put_object = smallest_option_object
-                    call_name = self.instrument_manager.options_maps.put_call_map[put_object.instrument_name]
-                    call_object = self.instrument_manager.options[call_name]
-
-                temp_dict = {"call" : call_object,
-                             "put" : put_object}
-
-                self.expiry_option_pair_map[expiry] = temp_dict
-        
-    def _create_yield_curve(self,):
-        yte_arr = []
-        yield_arr = []
-        print(f"\n_create_yield_curve")
-        for expiry, object_dict in self.expiry_option_pair_map.items():
-            call_object = object_dict["call"]
-            put_object = object_dict["put"]
-            yte = utils.convert_unix_maturity_to_years(expiry)
-            dividend = get_implied_from_PC_black(call_object.mid,
-                                                 put_object.mid,
-                                                 call_object.underlying_object.mid,
-                                                 call_object.strike,
-                                                 yte)
-            if not np.isnan(dividend):
-                print(np.array((call_object.mid,
-                                                 put_object.mid,
-                                                 call_object.underlying_object.mid,
-                                                 call_object.strike,
-                                                 yte)))
-                print(f"\ndividend: {dividend}")
-                self.exp_yield[expiry] = dividend
-                yte_arr.append(yte)
-                yield_arr.append(dividend)
-                
-        return np.array(yte_arr), np.array(yield_arr)   
+    def _create_yield_curve(self):
+        intercept = self.fit_parity()
+        yte = utils.convert_unix_maturity_to_years(self.expiries)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if self.model_type == "black":
+                imp_yield = -np.log(self.discount) / yte
+            else:
+                spot = np.fromiter((np.nan if underlying_object is None else underlying_object.mid for underlying_object in self.expiry_underlying_objects),
+                                   dtype=float, count=len(self.expiry_underlying_objects))
+                imp_yield = -np.log(intercept / spot) / yte
+        imp_yield[~np.isfinite(imp_yield) | (yte <= 0)] = np.nan
+        self.imp_yield = imp_yield
+        return utils.filter_nans_2D(yte, imp_yield)
 
     def update_data(self, websocket_responses):
         for instrument_name, price_dict in websocket_responses.items():
@@ -223,22 +301,8 @@ class ImpliedFromOption:
         option_object.update_price(bid_price, ask_price, callbacks=False)
             
     def fit(self):
-        self._create_constructor()
         yte_arr, yield_arr = self._create_yield_curve()        
-        if len(self.exp_yield) > 2:
-            if np.all(np.diff(yield_arr) >= 0):
-                self.interpolator = PchipInterpolator(yte_arr, yield_arr)
-            else:
-                self.interpolator = make_interp_spline(yte_arr, yield_arr, k=2)
-        else:
-            self.interpolator = lambda x: self._null_arr 
-        xi = np.linspace(0, 1, 20)
-        print("\nevaluate")
-        print(np.round(self.interpolator(xi), 3))
-
-    def evaluate(self, yte):
-        xi = np.linspace(0, yte, 20)
-        return self.interpolator(xi).sum() / 20
+        self._fit_curve(yte_arr, yield_arr)
 
 
 class DummyYieldClass:
@@ -246,4 +310,6 @@ class DummyYieldClass:
         pass
     
     def evaluate(self, x):
-        return 0
\ No newline at end of file
+        if np.ndim(x) == 0:
+            return 0
+        return np.zeros(np.shape(x))
\ No newline at end of file
@@ -4,7 +4,7 @@ import time
 import math
 import pandas as pd
 from dataclasses import dataclass, field
-from typing import Dict
+from typing import Dict, ClassVar
 
 
 class _BaseInstrument:
@@ -19,6 +19,13 @@ class _BaseInstrument:
         self.valid_price=False
         self.valid_price_checker=valid_price_checker
             
+    def invalidate_price(self):
+        self.bid = np.nan
+        self.ask = np.nan
+        self.mid = np.nan
+        self.spread_perc = np.nan
+        self.valid_price = False
+        
     def add_metric_callback(self, callback):
         self._metric_callbacks.append(callback)
         
@@ -36,7 +43,10 @@ class _BaseInstrument:
             if callbacks:
                 for callback in self._metric_callbacks:
                     callback()
+            self.last_update_time = time.time()
+            return True
         self.last_update_time = time.time()
+        return False
         
 
 class Spot(_BaseInstrument):
@@ -60,9 +70,86 @@ class Future(_BaseInstrument):
         self.forward_rate = np.log(self.mid / self.underlying_object.mid) / yte
         
 
+@dataclass(slots=True)
+class OptionBook:
+    n_options: int
+    strike: np.ndarray = field(init=False)
+    expiry: np.ndarray = field(init=False)
+    flag_int: np.ndarray = field(init=False)
+    call_flag: np.ndarray = field(init=False)
+    bid: np.ndarray = field(init=False)
+    ask: np.ndarray = field(init=False)
+    mid: np.ndarray = field(init=False)
+    spread_perc: np.ndarray = field(init=False)
+    valid_price: np.ndarray = field(init=False)
+    last_update_time: np.ndarray = field(init=False)
+    underlying_price: np.ndarray = field(init=False)
+    moneyness: np.ndarray = field(init=False)
+    log_moneyness: np.ndarray = field(init=False)
+    OTM: np.ndarray = field(init=False)
+    ivol: np.ndarray = field(init=False)
+    delta: np.ndarray = field(init=False)
+    delta_mag: np.ndarray = field(init=False)
+    gamma: np.ndarray = field(init=False)
+    vega: np.ndarray = field(init=False)
+    theta: np.ndarray = field(init=False)
+    rho: np.ndarray = field(init=False)
+    standardised_moneyness: np.ndarray = field(init=False)
+    expiry_idx: np.ndarray = field(init=False)
+    
+    price_type_idx_map: ClassVar[dict] = {"bid" : 0,
+                                          "ask" : 1,
+                                          "mid" : 2}
+    option_columns: ClassVar[list] = ["strike", "expiry", "flag_int", "call_flag", "bid", "ask", "mid", "spread_perc",
+                                      "valid_price", "last_update_time", "underlying_price", "moneyness", "log_moneyness", "OTM"]
+    price_type_columns: ClassVar[list] = ["ivol", "delta", "delta_mag", "gamma", "vega", "theta", "rho", "standardised_moneyness"]
+    
+    def __post_init__(self):
+        n_price_types = len(self.price_type_idx_map)
+        for column in self.option_columns:
+            setattr(self, column, np.full(self.n_options, np.nan))
+        self.flag_int = np.ones(self.n_options, dtype=int)
+        self.call_flag = np.ones(self.n_options, dtype=bool)
+        self.valid_price = np.zeros(self.n_options, dtype=bool)
+        self.OTM = np.ones(self.n_options, dtype=bool)
+        self.last_update_time = np.full(self.n_options, time.time())
+        self.expiry_idx = np.zeros(self.n_options, dtype=int)
+        for column in self.price_type_columns:
+            setattr(self, column, np.full((n_price_types, self.n_options), np.nan))
+    
+    def invalidate_rows(self, idx):
+        for column in ["bid", "ask", "mid", "spread_perc"]:
+            getattr(self, column)[idx] = np.nan
+        self.valid_price[idx] = False
+        for column in self.price_type_columns:
+            getattr(self, column)[:, idx] = np.nan
+    
+    def copy_row(self, idx, other_book, other_idx):
+        for column in self.option_columns:
+            getattr(self, column)[idx] = getattr(other_book, column)[other_idx]
+        for column in self.price_type_columns:
+            getattr(self, column)[:, idx] = getattr(other_book, column)[:, other_idx]
+
+
+def _option_book_property(column, price_type_column=False):
+    if price_type_column:
+        def getter(self):
+            return getattr(self._option_book, column)[:, self._book_idx]
+        def setter(self, value):
+            getattr(self._option_book, column)[:, self._book_idx] = value
+    else:
+        def getter(self):
+            return getattr(self._option_book, column)[self._book_idx]
+        def setter(self, value):
+            getattr(self._option_book, column)[self._book_idx] = value
+    return property(getter, setter)
+
+
 class Option(_BaseInstrument):
     def __init__(self, instrument_name, underlying_object, strike, expiry, flag, flag_int, option_engine,
                  valid_price_checker=utils.ValidPriceChecker(20).check, **kwargs):
+        self._option_book = OptionBook(1)
+        self._book_idx = 0
         super().__init__(instrument_name, valid_price_checker)
         self.underlying_object=underlying_object
         self.category="option"
@@ -70,24 +157,11 @@ class Option(_BaseInstrument):
         self.expiry=expiry
         self.flag=flag
         self.flag_int=flag_int
-        self.ivol= np.nan*np.zeros(3)
-        self.delta= np.nan* np.zeros(3)
-        self.delta_mag= np.nan * np.zeros(3)
-        self.gamma=np.nan* np.zeros(3)
-        self.vega=np.nan*np.zeros(3)
-        self.rho=np.nan*np.zeros(3)
-        self.theta=np.nan*np.zeros(3)
-        self.moneyness=np.nan
-        self.log_moneyness=np.nan
-        self.standardised_moneyness=np.nan* np.zeros(3)
-        self.OTM=np.nan
         self.option_engine=option_engine
         self._nan_3_numpy = np.nan * np.empty(3)
         self.call_flag= True if flag_int == 1 else False
         
-        self.price_type_idx_map = {"bid" : 0,
-                                   "ask" : 1,
-                                   "mid" : 2}
+        self.price_type_idx_map = OptionBook.price_type_idx_map
         
         self.add_metric_callback(self._OTM_checker)
         self.add_metric_callback(self.calculate_implied_volatility)
@@ -107,10 +181,21 @@ class Option(_BaseInstrument):
                 else:
                     self.OTM=True
 
+    def attach_to_book(self, option_book, idx):
+        option_book.copy_row(idx, self._option_book, self._book_idx)
+        self._option_book = option_book
+        self._book_idx = idx
+
     def get_all_metrics(self):
         return self.ivol, self.delta, self.delta_mag, self.gamma, self.vega, self.moneyness, self.log_moneyness,\
                 self.standardised_moneyness, self.OTM, self.call_flag, self.underlying_object.mid
         
+    def update_price_batched(self, bid=None, ask=None):
+        if self.update_price(bid, ask, callbacks=False):
+            self._OTM_checker()
+            return True
+        return False
+
     def calculate_implied_volatility(self,):
         #if self.underlying_object.valid_price:
          #   if self.valid_price and self.OTM==True:
@@ -141,6 +226,7 @@ class Option(_BaseInstrument):
                                                      )
         
     def calculate_all_moneyness(self,):
+        self.underlying_price = self.underlying_object.mid
         if self.underlying_object.valid_price:
             self.moneyness = self.strike / self.underlying_object.mid
             self.log_moneyness = np.log(self.moneyness)
@@ -160,13 +246,20 @@ class Option(_BaseInstrument):
         self.moneyness = self.strike / self.underlying_object.mid
 
 
+for _column in OptionBook.option_columns:
+    setattr(Option, _column, _option_book_property(_column))
+for _column in OptionBook.price_type_columns:
+    setattr(Option, _column, _option_book_property(_column, price_type_column=True))
+
+
 class OptionInverted(Option):
     def update_price(self, bid=None, ask=None, **kwargs):
         if not np.isnan(self.underlying_object.mid):
             if bid != None and ask != None:
-                super().update_price(bid * self.underlying_object.mid, ask * self.underlying_object.mid, **kwargs)  
+                return super().update_price(bid * self.underlying_object.mid, ask * self.underlying_object.mid, **kwargs)  
             else:
-                super().update_price(bid=bid, ask=ask, **kwargs)
+                return super().update_price(bid=bid, ask=ask, **kwargs)
+        return False
     
         
 @dataclass
@@ -199,6 +292,8 @@ class InstrumentManager:
         self.name_to_instrument_type = {}
         self.futures_maps: BaseMap
         self.options_maps: OptionMap
+        self.option_book: OptionBook
+        self.underlying_option_idx_map = {}
         self.all_instrument_objects = {}
         self.options_1_underlying_flag=False
         self.options_underlying_object=None
@@ -304,6 +399,8 @@ class InstrumentManager:
         temp_base = self._create_maps(self.options)
         
         self.options_maps = OptionMap(temp_base.index_name_map, temp_base.name_index_map)
+        self._create_option_book()
+        self._create_underlying_option_idx_map()
         
         self.update_option_attr_maps()
         
@@ -366,6 +463,19 @@ class InstrumentManager:
         self.options_maps.expiry_strike_instrument_map = expiry_strike_instrument_map
         self.options_maps.strike_expiry_instrument_map = strike_expiry_instrument_map
     
+    def _create_option_book(self):
+        self.option_book = OptionBook(len(self.options))
+        for instrument_name, idx in self.options_maps.name_index_map.items():
+            self.options[instrument_name].attach_to_book(self.option_book, idx)
+        self.option_book.expiry_idx = utils.year_fraction_clock.register_expiries(self.option_book.expiry)
+    
+    def _create_underlying_option_idx_map(self):
+        underlying_option_idx = {}
+        for instrument_name, idx in self.options_maps.name_index_map.items():
+            underlying_name = self.options[instrument_name].underlying_object.instrument_name
+            underlying_option_idx.setdefault(underlying_name, []).append(idx)
+        self.underlying_option_idx_map = {underlying_name : np.array(idx_list, dtype=int) for underlying_name, idx_list in underlying_option_idx.items()}
+    
     def _create_maps(self, instrument_object_dict):        
         index_name_map = {idx: name for idx, name in enumerate(instrument_object_dict)}
         name_index_map = {name: idx for idx, name in enumerate(instrument_object_dict)}
@@ -1,23 +1,58 @@
 from scipy.interpolate import RBFInterpolator, bisplrep, bisplev
 import numpy as np
+from py_vol_surface import utils
 
 class CustomRBFInterpolator(RBFInterpolator):
-    def __init__(self, n_x, n_y, kernel='linear', *args, **kwargs):
+    def __init__(self, n_x, n_y, kernel='linear', *args, reuse_system=True, **kwargs):
         self.n_x=n_x
         self.n_y=n_y
         self._initialized = False
         self.y = None
         self.z = None
         self.kernel = kernel
+        self.reuse_system = reuse_system
         self.args = args
         self.kwargs = kwargs
+        self._cardinal_coeffs = None
 
     def fit(self, x=None, y=None, z=None):
         x = x.flatten()
         y = y.flatten()
-        self.y = np.column_stack((x, y))
-        self.z = z.flatten()   
-        super().__init__(self.y, self.z, kernel=self.kernel, *self.args, **self.kwargs)
+        nodes = np.column_stack((x, y))
+        self.z = z.flatten()
+        
+        if self.reuse_system and self._same_nodes(nodes):
+            if self.kwargs.get("neighbors") is not None:
+                self.d = self.z[:, None]
+                self.d_shape = ()
+                return
+            if self._cardinal_coeffs is None:
+                super().__init__(nodes, np.eye(nodes.shape[0]), kernel=self.kernel, *self.args, **self.kwargs)
+                self._cardinal_coeffs = self._coeffs
+            self._coeffs = self._cardinal_coeffs @ self.z[:, None]
+            self.d = self.z[:, None]
+            self.d_shape = ()
+        else:
+            self._cardinal_coeffs = None
+            super().__init__(nodes, self.z, kernel=self.kernel, *self.args, **self.kwargs)
+        self._initialized = True
+    
+    def set_neighbors(self, neighbors):
+        self.kwargs["neighbors"] = neighbors
+        self._initialized = False
+        self._cardinal_coeffs = None
+    
+    def _same_nodes(self, nodes):
+        return (self._initialized
+                and self.y.shape == nodes.shape
+                and np.array_equal(self.y, nodes)
+                )
+    
+    def __getstate__(self):
+        return self.__dict__.copy()
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
         
     def evaluate(self, xi, yi):
         xi, yi = np.meshgrid(xi, yi)
@@ -42,3 +77,152 @@ class CustomBSplineInterpolator:
         x_vals.sort()
         y_vals.sort()
         return bisplev(x_vals, y_vals, self.tck)
+
+
+class SVIInterpolator:
+    def __init__(self, max_iter=20, tol=1e-10, min_points=3):
+        self.max_iter=max_iter
+        self.tol=tol
+        self.min_points=min_points
+        self.params = np.empty((0, 5))
+        self.t_slices = np.empty(0)
+        self._log_x = None
+        self._x_center = None
+        self._unix_time = False
+
+    def fit(self, x, y, z):
+        x, y, z = np.asarray(x, dtype=float).ravel(), np.asarray(y, dtype=float).ravel(), np.asarray(z, dtype=float).ravel()
+        self._unix_time = np.nanmin(y) > 1e6
+        t = self._to_years(y)
+        mask = (t > 0) & np.isfinite(x) & np.isfinite(z)
+        x, t, z = x[mask], t[mask], z[mask]
+        
+        log_x = bool(np.all(x > 0))
+        x_center = np.median(x) if log_x else 0.
+        warm_m_shift = np.log(self._x_center / x_center) if log_x and self._log_x and self._x_center else 0.
+        self._log_x, self._x_center = log_x, x_center
+        k = self._to_k(x)
+        w = z**2 * t
+
+        t_unique, slice_idx, counts = np.unique(t, return_inverse=True, return_counts=True)
+        keep = counts >= self.min_points
+        if not keep.any():
+            raise ValueError(f"SVI needs at least {self.min_points} points in one expiry")
+        
+        n_slices, n_max = t_unique.size, counts.max()
+        position = np.zeros(k.size, dtype=int)
+        order = np.argsort(slice_idx, kind="stable")
+        position[order] = np.arange(k.size) - np.repeat(np.cumsum(counts) - counts, counts)
+        
+        K = np.zeros((n_slices, n_max))
+        W = np.zeros((n_slices, n_max))
+        weights = np.zeros((n_slices, n_max))
+        K[slice_idx, position] = k
+        W[slice_idx, position] = w
+        weights[slice_idx, position] = 1.
+        
+        K, W, weights, t_unique = K[keep], W[keep], weights[keep], t_unique[keep]
+        params = self._initial_params(K, W, weights, t_unique, warm_m_shift)
+        self.params = self._levenberg_marquardt(params, K, W, weights)
+        self.t_slices = t_unique
+
+    def evaluate(self, xi, yi):
+        x_vals = np.unique(xi)
+        t_vals = self._to_years(np.unique(yi))
+        w_slices = self._svi(self.params[:, None, :], self._to_k(x_vals)[None, :])
+        
+        t_slices = self.t_slices
+        idx = np.clip(np.searchsorted(t_slices, t_vals), 1, max(t_slices.size - 1, 1))
+        if t_slices.size == 1:
+            w = w_slices[0][:, None] * (t_vals / t_slices[0])[None, :]
+        else:
+            t_lo, t_hi = t_slices[idx - 1], t_slices[idx]
+            weight_hi = np.clip((t_vals - t_lo) / (t_hi - t_lo), 0, 1)
+            w = (1 - weight_hi) * w_slices[idx - 1].T + weight_hi * w_slices[idx].T
+            w = np.where(t_vals < t_slices[0], w_slices[0][:, None] * t_vals / t_slices[0], w)
+            w = np.where(t_vals > t_slices[-1], w_slices[-1][:, None] * t_vals / t_slices[-1], w)
+        
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.sqrt(np.maximum(w, 0) / t_vals)
+
+    def _to_years(self, y):
+        if self._unix_time:
+            return utils.convert_unix_maturity_to_years(y)
+        return y
+
+    def _to_k(self, x):
+        if self._log_x:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                return np.log(x / self._x_center)
+        return x
+
+    def _initial_params(self, K, W, weights, t_slices, warm_m_shift):
+        W_masked = np.where(weights > 0, W, np.inf)
+        argmin = np.argmin(W_masked, axis=1)
+        rows = np.arange(K.shape[0])
+        k_span = np.maximum(np.max(np.where(weights > 0, K, -np.inf), axis=1) - np.min(np.where(weights > 0, K, np.inf), axis=1), 1e-3)
+        
+        params = np.empty((K.shape[0], 5))
+        params[:, 0] = 0.9 * W[rows, argmin]
+        params[:, 1] = np.maximum(np.max(np.where(weights > 0, W, -np.inf), axis=1) - W[rows, argmin], 1e-4) / k_span
+        params[:, 2] = 0.
+        params[:, 3] = K[rows, argmin]
+        params[:, 4] = 0.1 * k_span
+        
+        if self.t_slices.size > 0:
+            nearest = np.clip(np.searchsorted(self.t_slices, t_slices), 1, max(self.t_slices.size - 1, 1))
+            if self.t_slices.size > 1:
+                nearest = np.where(np.abs(self.t_slices[nearest - 1] - t_slices) < np.abs(self.t_slices[nearest] - t_slices), nearest - 1, nearest)
+            else:
+                nearest = np.zeros_like(nearest)
+            warm = np.abs(self.t_slices[nearest] - t_slices) < 1 / 365
+            params[warm] = self.params[nearest[warm]]
+            params[warm, 3] += warm_m_shift
+        return params
+
+    @staticmethod
+    def _svi(params, k):
+        a, b, rho, m, sigma = (params[..., i] for i in range(5))
+        d = k - m
+        return a + b * (rho * d + np.sqrt(d**2 + sigma**2))
+
+    def _levenberg_marquardt(self, params, K, W, weights):
+        damping = np.full(params.shape[0], 1e-3)
+        identity = np.eye(5)
+        
+        def residuals_and_cost(p):
+            residuals = (self._svi(p[:, None, :], K) - W) * weights
+            return residuals, np.sum(residuals**2, axis=1)
+        
+        residuals, cost = residuals_and_cost(params)
+        for _ in range(self.max_iter):
+            a, b, rho, m, sigma = (params[:, i, None] for i in range(5))
+            d = K - m
+            r = np.sqrt(d**2 + sigma**2)
+            jac = np.stack((np.ones_like(K), rho * d + r, b * d, -b * (rho + d / r), b * sigma / r), axis=-1) * weights[..., None]
+            
+            JtJ = np.einsum("snj,snk->sjk", jac, jac)
+            Jtr = np.einsum("snj,sn->sj", jac, residuals)
+            diag = np.einsum("sjj->sj", JtJ)
+            lhs = JtJ + damping[:, None, None] * (diag[:, :, None] * identity + 1e-12 * identity)
+            step = np.linalg.solve(lhs, -Jtr[..., None])[..., 0]
+            
+            candidate = self._project(params + step)
+            new_residuals, new_cost = residuals_and_cost(candidate)
+            accept = new_cost < cost
+            converged = np.all((accept & (cost - new_cost <= self.tol * cost)) | (cost <= 1e-30))
+            
+            params = np.where(accept[:, None], candidate, params)
+            residuals = np.where(accept[:, None], new_residuals, residuals)
+            cost = np.where(accept, new_cost, cost)
+            damping = np.where(accept, damping * 0.3, damping * 10)
+            if converged:
+                break
+        return params
+
+    @staticmethod
+    def _project(params):
+        params[:, 1] = np.maximum(params[:, 1], 0)
+        params[:, 2] = np.clip(params[:, 2], -0.999, 0.999)
+        params[:, 4] = np.maximum(params[:, 4], 1e-4)
+        return params
@@ -15,6 +15,25 @@ class CustomColorMap(pg.ColorMap):
 
         colors = colourmap.map(pos, mode='byte')        
         super().__init__(pos=pos, color=colors, mode='byte')
+        self._float_luts = {}
+    
+    def float_lookup_table(self, n_points=1024):
+        if not n_points in self._float_luts:
+            self._float_luts[n_points] = self.getLookupTable(0., 1., nPts=n_points, alpha=True, mode='float').astype(np.float32)
+        return self._float_luts[n_points]
+    
+    def map_into(self, values, out, n_points=1024):
+        """
+        Writes the colours of values in [0, 1] into the preallocated (..., 4) out buffer by quantising onto
+        an n_points lookup table. NaN values get NaN colours, as with map().
+        """
+        lut = self.float_lookup_table(n_points)
+        nan_mask = np.isnan(values)
+        lut_idx = np.rint(np.clip(np.where(nan_mask, 0, values), 0, 1) * (n_points - 1)).astype(np.intp)
+        np.take(lut, lut_idx, axis=0, out=out)
+        if nan_mask.any():
+            out[nan_mask] = np.nan
+        return out
         
      
 class ColorSquare(QtWidgets.QLabel):
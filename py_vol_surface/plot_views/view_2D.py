@@ -59,9 +59,9 @@ class SubPlot(pg.PlotWidget):
                 y=self.prev_y  
             
             if x and y:
-                data_container = self.data_container_manager.objects[price_type]
-                if data_container.surface.valid_values:
-                    xi, yi = data_container.surface.x, data_container.surface.y
+                snapshot = self.data_container_manager.snapshot.objects.get(price_type)
+                if not snapshot is None and snapshot.surface.valid_values:
+                    xi, yi = snapshot.surface.x, snapshot.surface.y
 
                     if self.axis_3D_directions=="xz": 
                         other_axis_pos = self.normalisation_engine.y_LB + y * (self.normalisation_engine.y_UB - self.normalisation_engine.y_LB)
@@ -75,7 +75,7 @@ class SubPlot(pg.PlotWidget):
                         x_vals = [other_axis_pos] * yi.size
                         x_vals_plotting = y_vals
                         
-                    z_vals = data_container.surface.interpolator.evaluate(x_vals, y_vals)
+                    z_vals = snapshot.interpolator.evaluate(x_vals, y_vals)
 
                     if z_vals.ndim == 1:
                         y_vals_plotting = z_vals
@@ -245,7 +245,7 @@ class CustomGLViewWidget(gl.GLViewWidget):
         if (self.cross_hairs_enabled
             and self.main_window.surface_flag
             and self.top_price_type in self.main_window.current_price_types
-            and self.data_container_manager.objects[self.top_price_type].surface.valid_values
+            and self.data_container_manager.snapshot.objects[self.top_price_type].surface.valid_values
             and not self.mouse_pos is None
             ):
             
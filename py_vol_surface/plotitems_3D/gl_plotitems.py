@@ -2,6 +2,8 @@ import pyqtgraph.opengl as gl
 import numpy as np
 import time
 class glSurface(gl.GLSurfacePlotItem):
+    lut_size=1024
+    
     def __init__(self, price_type, data_object, normalisation_engine, parent_widget=None,**kwargs):
         self.data_object=data_object
         self.init=True
@@ -14,17 +16,32 @@ class glSurface(gl.GLSurfacePlotItem):
         self.x_norm = None
         self.y_norm = None
         self.z_norm = None 
+        self._x_norm_drawn = None
+        self._y_norm_drawn = None
         self.plot_name = f"{self.type}_{price_type}"
         self.colormap=data_object.colourmap
-        self.colors = self.colormap.map(self.z, mode='float')
+        self.colour_buffer = None
         super().__init__(x=self.x, y=self.y, z=self.z, **kwargs)    
 
+    def _update_colours(self):
+        if self.colour_buffer is None or self.colour_buffer.shape[:-1] != self.z_norm.shape:
+            self.colour_buffer = np.empty(self.z_norm.shape + (4,), dtype=np.float32)
+        self.data_object.colourmap.map_into(self.z_norm, self.colour_buffer, self.lut_size)
+    
+    def _set_normalised_data(self, **kwargs):
+        self._update_colours()
+        update_params = {"z" : self.z_norm, "colors" : self.colour_buffer}
+        if self._x_norm_drawn is None or not np.array_equal(self._x_norm_drawn, self.x_norm):
+            update_params["x"] = self._x_norm_drawn = self.x_norm
+        if self._y_norm_drawn is None or not np.array_equal(self._y_norm_drawn, self.y_norm):
+            update_params["y"] = self._y_norm_drawn = self.y_norm
+        return super().setData(**update_params, **kwargs)
+    
     def setData(self, x=None, y=None, z=None, colors=None, **kwargs):
         if self.init:
-            self.colors = self.data_object.colourmap.map(self.z, mode='float')
             self.init=False
             self.x_norm, self.y_norm, self.z_norm = self.normalisation_engine.normalise_xyz(x, y, z)
-            return super().setData(x=self.x_norm, y=self.y_norm, z=self.z_norm, colors=self.colors, **kwargs)
+            return self._set_normalised_data(**kwargs)
         else:
             if not x is None:
                 self.x=x
@@ -34,8 +51,7 @@ class glSurface(gl.GLSurfacePlotItem):
                 self.z=z   
             if self.data_object.valid_values:
                 self.x_norm, self.y_norm, self.z_norm = self.normalisation_engine.normalise_xyz(self.x, self.y, self.z)
-                self.colors = self.data_object.colourmap.map(self.z_norm, mode='float')
-                return super().setData(x=self.x_norm, y=self.y_norm, z=self.z_norm, colors=self.colors, **kwargs)
+                return self._set_normalised_data(**kwargs)
 
 
 class glScatter(gl.GLScatterPlotItem):
@@ -51,38 +67,76 @@ class glScatter(gl.GLScatterPlotItem):
         self.z=data_object.z
         self.init=True
         self.plot_name = f"{self.type}_{price_type}"
-
-        self.x_norm = self.normalisation_engine.normalise_x(self.x)
-        self.y_norm = self.normalisation_engine.normalise_y(self.y)
-        self.z_norm = self.normalisation_engine.normalise_z(self.z)
-        pos = np.column_stack((self.x_norm, self.y_norm, self.z_norm))
-        super().__init__(pos=pos, color=self.data_object.colour, **kwargs)        
+        
+        self.pos_buffer = np.empty((0, 3), dtype=np.float32)
+        self.n_points = 0
+        self._written_norm_params = (None, None, None)
         self.color = self.data_object.colour
+        super().__init__(color=self.color, **kwargs)        
+    
+    @property
+    def capacity(self):
+        return self.pos_buffer.shape[0]
+    
+    @property
+    def x_norm(self):
+        return self.pos_buffer[:self.n_points, 0]
+    
+    @property
+    def y_norm(self):
+        return self.pos_buffer[:self.n_points, 1]
+    
+    @property
+    def z_norm(self):
+        return self.pos_buffer[:self.n_points, 2]
+    
+    def _resize(self, n_points):
+        if n_points > self.capacity:
+            new_buffer = np.empty((max(n_points, 2 * self.capacity), 3), dtype=np.float32)
+            new_buffer[:self.n_points] = self.pos_buffer[:self.n_points]
+            self.pos_buffer = new_buffer
+        self.n_points = n_points
+    
+    def _write_positions(self, x=None, y=None, z=None):
+        if not x is None:
+            self._resize(x.size)
+            self.pos_buffer[:self.n_points, 0] = self.normalisation_engine.normalise_x(x)
+        if not y is None:
+            self.pos_buffer[:self.n_points, 1] = self.normalisation_engine.normalise_y(y)
+        if not z is None:
+            self.pos_buffer[:self.n_points, 2] = self.normalisation_engine.normalise_z(z)
+    
+    def _norm_params(self):
+        engine = self.normalisation_engine
+        return ((engine.scale_x, engine.shift_x, engine.x_min),
+                (engine.scale_y, engine.shift_y, engine.y_min),
+                (engine.scale_z, engine.shift_z, engine.z_min))
     
     def setData(self, x=None, y=None, z=None, pos=None, color=None, **kwargs):
+        norm_params = self._norm_params()
         if self.init:
-            
             self.init=False
-            #self.x_norm, self.y_norm, self.z_norm = self.normalisation_engine.normalise_xyz(pos[:,0], pos[:,1], pos[:,2])
-            pos = np.column_stack((self.x_norm, self.y_norm, self.z_norm))
+            self._write_positions(self.x, self.y, self.z)
+            self._written_norm_params = norm_params
             self.timer = time.time()
-            
-            return super().setData(pos=pos, color=self.color, **kwargs)
+            return super().setData(pos=self.pos_buffer[:self.n_points], color=self.color, **kwargs)
         else:           
             if self.data_object.valid_values:
                 if not pos is None:
-                    self.x = pos[:,0]
-                    self.y = pos[:,1]
-                    self.z = pos[:,2]
-                else:                    
-                    if not x is None:
-                        self.x=x
-                    if not y is None:
-                        self.y=y
-                    if not z is None:
-                        self.z=z
-                    self.x_norm, self.y_norm, self.z_norm = self.normalisation_engine.normalise_xyz(self.x, self.y, self.z)
-                    pos = np.column_stack((self.x_norm, self.y_norm, self.z_norm))
-                    return super().setData(pos=pos, color=self.color, **kwargs)
-    
-    
\ No newline at end of file
+                    x, y, z = pos[:,0], pos[:,1], pos[:,2]
+                if not x is None:
+                    self.x=x
+                if not y is None:
+                    self.y=y
+                if not z is None:
+                    self.z=z
+                
+                if self.x.size == self.n_points:
+                    renormalised = [params != written for params, written in zip(norm_params, self._written_norm_params)]
+                    self._write_positions(self.x if not x is None or renormalised[0] else None,
+                                          self.y if not y is None or renormalised[1] else None,
+                                          self.z if not z is None or renormalised[2] else None)
+                else:
+                    self._write_positions(self.x, self.y, self.z)
+                self._written_norm_params = norm_params
+                return super().setData(pos=self.pos_buffer[:self.n_points], color=self.color, **kwargs)
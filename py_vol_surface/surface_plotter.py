@@ -14,6 +14,7 @@ from py_vol_surface.settings import settings_widgets
 from py_vol_surface import instruments
 from py_vol_surface import plotting_engines 
 from py_vol_surface import defaults 
+from py_vol_surface import utils
 from py_vol_surface.tables import table_items 
 
 
@@ -40,6 +41,7 @@ class MainWindow(QMainWindow):
         data_processing_config=config["data_processing_config"]
         self.starting_price_type=config["starting_price_type"]
         self.plotting_config=config["plotting_config"]
+        utils.year_fraction_clock.set_day_count(data_processing_config.get("day_count", "ACT/365"))
                 
         self.last_plot_update = time.time()
         self.current_view_selection="Surface"   # options: vol_table, surface, smirk, term
@@ -67,6 +69,7 @@ class MainWindow(QMainWindow):
         self.count=0
         self.counter=0
         self.plot_mutex = QMutex()          
+        self._drawn_versions = {}
                 
         self.data_container_manager, self.instrument_manager, base_domain, self.n_options = self.initData(data_config, option_config, future_config, interest_rate_config, dividend_rate_config)
 
@@ -80,7 +83,7 @@ class MainWindow(QMainWindow):
         self.axis_transform_engine, self.normalisation_engine = self.initEngines(self.instrument_manager, base_domain)
         self.widget_surface.normalisation_engine=self.normalisation_engine
         
-        self.price_process_worker, self.market_data_worker = self.initWorkers(self.axis_transform_engine,
+        self.price_process_worker, self.compute_worker, self.compute_thread, self.market_data_worker = self.initWorkers(self.axis_transform_engine,
                                                                               self.normalisation_engine,
                                                                               self.data_container_manager,
                                                                               self.instrument_manager,
@@ -105,6 +108,7 @@ class MainWindow(QMainWindow):
         self.initUI(self.widget_surface, self.widget_vol_table, self.widget_omon_table, self.widget_subplot_vol_skew, self.widget_subplot_vol_term, self.legend)
 
         self.showMaximized()
+        self.compute_thread.start()
         self.market_data_worker.start()
     
     def initData(self, data_config, option_config, future_config, interest_rate_config, dividend_rate_config):
@@ -115,7 +119,7 @@ class MainWindow(QMainWindow):
                                                                                      dividend_rate_config["engine"],)
                                                                                                                                      
         data_container_manager, base_domain = data_objects.create_init_dataclasses(df_options, self.all_price_types)
-        data_container_manager = data_objects.DataContainerManager(self.all_price_types)
+        data_container_manager = data_objects.DataContainerManager(self.all_price_types, option_book=instrument_manager.option_book)
         return data_container_manager, instrument_manager, base_domain, df_options["instrument_name"].unique().size
     
     def initEngines(self, instrument_manager, base_domain):
@@ -142,10 +146,22 @@ class MainWindow(QMainWindow):
                                                       data_processing_config["websocket_json_format"],
                                                       interest_rate_config,
                                                       dividend_rate_config,
-                                                      timer_process_data=data_processing_config["timer_process_data"])
-        market_data_worker = workers.WebsocketWorker(**websocket_config)
-        market_data_worker.update_signal.connect(self.process_market_data)
-        return price_process_worker, market_data_worker
+                                                      timer_process_data=data_processing_config["timer_process_data"],
+                                                      stale_quote_ttl=data_processing_config.get("stale_quote_ttl"),
+                                                      stale_sweep_interval=data_processing_config.get("stale_sweep_interval", 5),
+                                                      tick_instrument_names=getattr(websocket_config.get("q"), "instrument_names", None))
+        compute_worker = workers.PriceProcessWorker(price_process_worker, self.plot_mutex, self.response_buffer_flag)
+        compute_thread = QtCore.QThread()
+        compute_worker.moveToThread(compute_thread)
+        compute_thread.started.connect(compute_worker.start_stale_sweep)
+        compute_thread.finished.connect(compute_worker.stale_sweep_timer.stop)
+        compute_worker.processed_signal.connect(self.process_market_data)
+        
+        market_data_worker = workers.WebsocketWorker(**{"instrument_key" : data_processing_config["websocket_json_format"]["instrument_key"],
+                                                        "websocket_json_format" : data_processing_config["websocket_json_format"],
+                                                        **websocket_config})
+        market_data_worker.update_signal.connect(compute_worker.process_market_data)
+        return price_process_worker, compute_worker, compute_thread, market_data_worker
     
     def initPlots(self, GLViewWidget, data_container_manager, normalisation_engine, colour_styles_config):
         IVOL_skew_curve, IVOL_term_curve = plot_views_utils.initialise_plotdataitems(self.all_price_types, colour_styles_config["scatter"])
@@ -225,19 +241,7 @@ class MainWindow(QMainWindow):
         #self.widget_layout_v_main.setSizes([1, 1, 5]) 
         self.widget_layout_v_main.setContentsMargins(0,0,0,0)
     
-    def process_market_data(self, websocket_response, bulk_response=False):
-        if self.response_buffer_flag:                
-            if bulk_response:
-
-                self.price_process_worker.bulk_response(websocket_response)
-            else:
-                self.price_process_worker.update_response_buffer(websocket_response[0])
-
-            if self.price_process_worker.check_enough_time():
-                self.price_process_worker.update_price_with_buffer()    
-        else:
-            self.price_process_worker.update_response_buffer(websocket_response[0])
-        
+    def process_market_data(self):
         if time.time() - self.last_plot_update > self.plotting_config["timer_update_plot"]:
             if len(self.current_price_types) > 0:
                 self.check_normalisation_bounds()
@@ -246,17 +250,19 @@ class MainWindow(QMainWindow):
             self.last_plot_update = time.time()
             
     def check_normalisation_bounds(self):
-        if self.data_container_manager.features.valid_values_any:
+        snapshot = self.data_container_manager.snapshot
+        if snapshot.valid_values_any:
             if self.waiting_first_plot:
                 for axis in ["x", "y", "z"]:
-                    getattr(self.normalisation_engine, f"create_{axis}_norm")(getattr(self.data_container_manager, f"{axis}_min"),
-                                                                              getattr(self.data_container_manager, f"{axis}_max"))
+                    getattr(self.normalisation_engine, f"create_{axis}_norm")(getattr(snapshot, f"{axis}_min"),
+                                                                              getattr(snapshot, f"{axis}_max"))
                     self.axis_manager.update_ticks([getattr(self.normalisation_engine, f"{axis}_LB"),
                                                     getattr(self.normalisation_engine, f"{axis}_UB")],
                                                     axis)
                 self.waiting_first_plot=False
-            else:
-                _ = self.plot_changed_cleanup()
+                self._drawn_versions.clear()
+            elif self.plot_changed_cleanup():
+                self._drawn_versions.clear()
 
     def _check_norm_engine_axis_equiv(self,):  #Unused
         if self.data_container_manager.features.valid_values_any:
@@ -331,7 +337,7 @@ class MainWindow(QMainWindow):
         new_metric = self.axis_transform_engine.generator.label_metric_map[axis_label]
         if getattr(self.axis_transform_engine, f"{axis_direction}_metric") == new_metric:
             return
-        else:
+        with QMutexLocker(self.plot_mutex):
             self.axis_transform_engine.switch_axis(new_metric, axis_direction)        
             for price_type in self.current_price_types:
                 data_container=self.data_container_manager.objects[price_type]
@@ -343,12 +349,13 @@ class MainWindow(QMainWindow):
             self._normalisation_process(axis_label, axis_direction)
             
     def force_update_all_plots(self):
+        snapshot = self.data_container_manager.snapshot
         for price_type in self.current_price_types:
             price_type_dict=self.widget_surface.plot_items[price_type]
             for plot_type, plot_object in price_type_dict.items():
                 if getattr(self, f"{plot_type}_flag"):
-                    data_container = getattr(self.data_container_manager.objects[price_type], plot_type)
-                    plot_object.setData(x=data_container.x, y=data_container.y, z=data_container.z)
+                    plot_snapshot = getattr(snapshot.objects[price_type], plot_type)
+                    plot_object.setData(x=plot_snapshot.x, y=plot_snapshot.y, z=plot_snapshot.z)
         
     def _normalisation_process(self, axis_label=None, axis_direction=None):
         if self.data_container_manager.features.valid_values_any:
@@ -376,18 +383,23 @@ class MainWindow(QMainWindow):
             self.subplots_flag=False
     
     def plot_changed_cleanup(self):
-        if self.data_container_manager.features.valid_values_any:
-            axis_req_renorm = self.normalisation_engine.check_value_bounds(*self.data_container_manager.get_limits())
+        snapshot = self.data_container_manager.snapshot
+        if snapshot.valid_values_any:
+            axis_req_renorm = self.normalisation_engine.check_value_bounds(*snapshot.get_limits())
             for axis in axis_req_renorm:
-                getattr(self.normalisation_engine, f"create_{axis}_norm")(getattr(self.data_container_manager, f"{axis}_min"),
-                                                                          getattr(self.data_container_manager, f"{axis}_max"))
+                getattr(self.normalisation_engine, f"create_{axis}_norm")(getattr(snapshot, f"{axis}_min"),
+                                                                          getattr(snapshot, f"{axis}_max"))
                 self.axis_manager.update_ticks([getattr(self.normalisation_engine, f"{axis}_LB"),
                                                 getattr(self.normalisation_engine, f"{axis}_UB")], axis)
-            return True
+            return len(axis_req_renorm) > 0
         else:
             return False
 
-    def toggle_price_type(self, price_type):       
+    def toggle_price_type(self, price_type):
+        with QMutexLocker(self.plot_mutex):
+            self._toggle_price_type(price_type)
+
+    def _toggle_price_type(self, price_type):       
         if not price_type in self.current_price_types:
             self.current_price_types.append(price_type)
             data_container = data_objects.DataContainer()
@@ -420,10 +432,11 @@ class MainWindow(QMainWindow):
     def toggle_3D_objects(self, plot_type):
         plot_type_lower = plot_type.lower()
         if not getattr(self, f"{plot_type_lower}_flag"):
+            snapshot = self.data_container_manager.snapshot
             for price_type, inner_plot_objects in self.widget_surface.plot_items.items():
                 plot_object = inner_plot_objects[plot_type_lower]
-                data_container = getattr(self.data_container_manager.objects[price_type], plot_type_lower)
-                plot_object.setData(data_container.x, data_container.y, data_container.z)
+                plot_snapshot = getattr(snapshot.objects[price_type], plot_type_lower)
+                plot_object.setData(plot_snapshot.x, plot_snapshot.y, plot_snapshot.z)
                 plot_object.show()   
             setattr(self, f"{plot_type_lower}_flag", True)
         else:
@@ -453,15 +466,15 @@ class MainWindow(QMainWindow):
         self.current_view_selection=new_view
         self.update_all_plots()
 
-    def _update_surface_plot(self, price_type):
-        data_object=self.data_container_manager.objects[price_type].surface
+    def _update_surface_plot(self, price_type, snapshot):
+        data_object=snapshot.surface
         if data_object.valid_values:
             surface = self.widget_surface.plot_items[price_type]["surface"]
             surface.setData(x=data_object.x, y=data_object.y, z=data_object.z)
             self.waiting_first_plot=False
         
-    def _update_scatter_plot(self, price_type):
-        data_object = self.data_container_manager.objects[price_type].scatter
+    def _update_scatter_plot(self, price_type, snapshot):
+        data_object = snapshot.scatter
         if data_object.valid_values:            
             scatter_plot = self.widget_surface.plot_items[price_type]["scatter"]
             
@@ -484,15 +497,24 @@ class MainWindow(QMainWindow):
                 combined_new_text = combined_new_text + new_text_info
         self.widget_surface.set_spot_text(f"{combined_new_text}")
 
+    def _snapshot_to_draw(self, price_type):
+        snapshot = self.data_container_manager.snapshot.objects.get(price_type)
+        if snapshot is None or self._drawn_versions.get((self.current_view_selection, price_type)) == snapshot.version:
+            return None
+        return snapshot
+
     def _update_surface(self, price_type):
         if not self.widget_surface.interacting:
-            if self.surface_flag:
-                self._update_surface_plot(price_type)
-            if self.scatter_flag:                
-                self._update_scatter_plot(price_type)
-                
-            for callback in self.widget_surface.price_updated_callbacks:
-                callback(price_type)
+            snapshot = self._snapshot_to_draw(price_type)
+            if not snapshot is None:
+                if self.surface_flag:
+                    self._update_surface_plot(price_type, snapshot)
+                if self.scatter_flag:                
+                    self._update_scatter_plot(price_type, snapshot)
+                    
+                for callback in self.widget_surface.price_updated_callbacks:
+                    callback(price_type)
+                self._drawn_versions[(self.current_view_selection, price_type)] = snapshot.version
         else:
             if not price_type in self.plot_interaction_buffer:
                 self.plot_interaction_buffer.append(price_type)
@@ -501,10 +523,13 @@ class MainWindow(QMainWindow):
             self._update_text()    
 
     def _update_vol_table(self, price_type):
-        self.widget_vol_table.update_table()
+        snapshot = self._snapshot_to_draw(price_type)
+        if not snapshot is None:
+            self.widget_vol_table.update_table()
+            self._drawn_versions[(self.current_view_selection, price_type)] = snapshot.version
 
     def _update_omon_table(self, price_type):
-        self.widget_omon_table.update_table()
+        self.widget_omon_table.update_table(self.data_container_manager.snapshot.option_book)
         if len(self.instrument_manager.spot) > 0:
             self.widget_omon_table.update_spot_text()    
 
@@ -528,6 +553,8 @@ class MainWindow(QMainWindow):
                         
     def closeEvent(self, event):
         self.market_data_worker.stop()
+        self.compute_thread.quit()
+        self.compute_thread.wait()
         if hasattr(self, 'streamer'):
             loop = asyncio.get_event_loop()
             loop.run_until_complete(self.streamer.close())
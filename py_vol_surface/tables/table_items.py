@@ -1,77 +1,283 @@
 from PySide6 import QtWidgets, QtCore, QtGui
 from datetime import datetime   
 import numpy as np
-import copy
 from . import tables_utils
-import time
 
 
-class VolTable(QtWidgets.QTableWidget):
+class VolTableModel(QtCore.QAbstractTableModel):
+    """
+    Serves the mid z_mat of the latest snapshot. Each refresh keeps the last displayed values and only
+    emits dataChanged over the rectangles of cells that moved by more than display_tol.
+    """
+    def __init__(self, tick_label_engine, display_tol=1e-3, parent=None):
+        super().__init__(parent)
+        self.tick_label_engine=tick_label_engine
+        self.display_tol=display_tol
+        self.z_mat=np.empty((0, 0))
+        self.row_vals=np.empty(0)
+        self.column_vals=np.empty(0)
+        self.row_labels=[]
+        self.column_labels=[]
+        
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self.z_mat.shape[0]
+    
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self.z_mat.shape[1]
+    
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and index.isValid():
+            return self.tick_label_engine.z_func(self.z_mat[index.row(), index.column()])
+        return None
+    
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole:
+            labels = self.column_labels if orientation == QtCore.Qt.Horizontal else self.row_labels
+            if section < len(labels):
+                return labels[section]
+        return None
+
+    def set_axes(self, row_vals, column_vals):
+        self.row_vals = np.asarray(row_vals)
+        self.column_vals = np.asarray(column_vals)
+        self.row_labels = [self.tick_label_engine.y_func(new_val) for new_val in self.row_vals]
+        self.column_labels = [self.tick_label_engine.x_func(new_val) for new_val in self.column_vals]
+        if self.z_mat.shape == (self.row_vals.size, self.column_vals.size):
+            if self.row_vals.size > 0:
+                self.headerDataChanged.emit(QtCore.Qt.Vertical, 0, self.row_vals.size - 1)
+            if self.column_vals.size > 0:
+                self.headerDataChanged.emit(QtCore.Qt.Horizontal, 0, self.column_vals.size - 1)
+        else:
+            self.beginResetModel()
+            self.z_mat = np.full((self.row_vals.size, self.column_vals.size), np.nan)
+            self.endResetModel()
+
+    def set_z_mat(self, z_mat):
+        if z_mat.shape != self.z_mat.shape:
+            self.beginResetModel()
+            self.z_mat = np.array(z_mat, dtype=float)
+            self.endResetModel()
+            return
+        
+        changed = ~np.isclose(z_mat, self.z_mat, rtol=0, atol=self.display_tol, equal_nan=True)
+        if not changed.any():
+            return
+        self.z_mat[changed] = z_mat[changed]
+        for top, bottom, left, right in self.changed_regions(changed):
+            self.dataChanged.emit(self.index(top, left), self.index(bottom, right), [QtCore.Qt.DisplayRole])
+    
+    @staticmethod
+    def changed_regions(changed):
+        changed_rows = changed.any(axis=1)
+        row_edges = np.flatnonzero(np.diff(np.concatenate(([False], changed_rows, [False])).astype(int)))
+        regions = []
+        for top, bottom in zip(row_edges[::2], row_edges[1::2] - 1):
+            changed_columns = np.flatnonzero(changed[top:bottom + 1].any(axis=0))
+            regions.append((top, bottom, changed_columns[0], changed_columns[-1]))
+        return regions
+
+
+class VolTable(QtWidgets.QTableView):
     def __init__(self, data_container_manager, tick_label_engine=None, parent=None):
+        super().__init__(parent)
         self.data_container_manager=data_container_manager
         self.tick_label_engine=tick_label_engine
-        self.column_items=[]
-        self.row_items=[]
+        self.vol_table_model = VolTableModel(tick_label_engine, parent=self)
+        self.setModel(self.vol_table_model)
         
         self.init_xy_data(data_container_manager)
-
-        super().__init__(self.rows, self.columns, parent)
-        self.setHorizontalHeaderLabels(self.column_vals)
-        self.setVerticalHeaderLabels(self.row_vals)
         self.update_table()
 
     def init_xy_data(self, data_container_manager):
         self.domain_mid = data_container_manager.objects["mid"].domain
-        
-        self.row_vals = self.domain_mid.y_vect
-        self.column_vals = self.domain_mid.x_vect
-        self.rows = self.row_vals.size
-        self.columns = self.column_vals.size
-        
-        self.column_vals=[self.tick_label_engine.x_func(new_val) for new_val in self.column_vals]
-        self.row_vals=[self.tick_label_engine.y_func(new_val) for new_val in self.row_vals]
+        self._update_table_labels()
 
     def update_table(self):
-        self.blockSignals(True)
-        self.setUpdatesEnabled(False)        
-        for idx in range(self.domain_mid.z_mat.shape[0]):
-            for jdx in range(self.domain_mid.z_mat.shape[1]):
-                new_val_str = self.tick_label_engine.z_func(self.domain_mid.z_mat[idx,jdx])
-                item = QtWidgets.QTableWidgetItem(new_val_str)
-                self.setItem(idx, jdx, item)
-        
-        self.blockSignals(False)
-        self.setUpdatesEnabled(True)
+        snapshot = self.data_container_manager.snapshot.objects.get("mid")
+        if snapshot is None:
+            return
+        self.vol_table_model.set_z_mat(snapshot.z_mat)
     
     def _update_table_labels(self):
-        self.row_vals = self.domain_mid.y_vect
-        self.column_vals = self.domain_mid.x_vect
-        self.rows = self.row_vals.size
-        self.columns = self.column_vals.size
-        
-        self.setColumnCount(self.columns)
-        self.setRowCount(self.rows)
+        self.vol_table_model.set_axes(self.domain_mid.y_vect, self.domain_mid.x_vect)
+        self.rows = self.vol_table_model.row_vals.size
+        self.columns = self.vol_table_model.column_vals.size
+        self.row_vals = self.vol_table_model.row_labels
+        self.column_vals = self.vol_table_model.column_labels
+
+
+class OptionMonitorModel(QtCore.QAbstractTableModel):
+    """
+    Rows are expiry headers followed by their strikes, each strike row pointing at the call and put rows
+    of the option book. refresh() gathers bid/ask/mid/ivol for every displayed pair in one pass from the
+    OptionBookSnapshot published by the compute thread, fills ITM ivols from the other side of the pair
+    and only reformats the cells whose rounded value changed.
+    """
+    metric_columns = ["bid", "ask", "mid", "ivol"]
+    
+    def __init__(self, data_cols, decimals=2, parent=None):
+        super().__init__(parent)
+        self.data_cols=data_cols
+        self.n_data_cols=len(data_cols)
+        self.n_cols=1 + 2 * self.n_data_cols
+        self.decimals=decimals
+        self.column_names = data_cols + [""] + data_cols
+        self.call_metric_cols = np.arange(1, self.n_data_cols)
+        self.put_metric_cols = self.call_metric_cols + self.n_data_cols + 1
+        self.metric_cols = np.concatenate((self.call_metric_cols, self.put_metric_cols))
+        self.name_cols = [0, self.n_data_cols + 1]
+        
+        self.cell_font = QtGui.QFont("Neue Haas Grotesk", 12)
+        self.header_font = QtGui.QFont("Neue Haas Grotesk", 14)
+        self.header_font.setBold(True)
+        self.name_header_font = QtGui.QFont("Neue Haas Grotesk", 14)
+        self.brushes = {"black" : QtGui.QBrush("black"),
+                        "grey" : QtGui.QBrush("grey"),
+                        "white" : QtGui.QBrush("white"),
+                        "orange" : QtGui.QBrush(QtGui.QColor("#fb8b1e")),
+                        "header" : QtGui.QBrush(QtGui.QColor("#414141"))}
+        self.rows = []
+        self.set_rows([])
+    
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self.rows = rows
+        self._create_row_arrays()
+        self.endResetModel()
+    
+    def replace_expiry_rows(self, expiry, strike_rows):
+        expiry_row = self.expiry_row(expiry)
+        n_old = sum(1 for row in self.rows if row[0] == expiry and not row[1] is None)
+        if n_old > 0:
+            self.beginRemoveRows(QtCore.QModelIndex(), expiry_row + 1, expiry_row + n_old)
+            del self.rows[expiry_row + 1 : expiry_row + 1 + n_old]
+            self._create_row_arrays()
+            self.endRemoveRows()
+        if len(strike_rows) > 0:
+            self.beginInsertRows(QtCore.QModelIndex(), expiry_row + 1, expiry_row + len(strike_rows))
+            self.rows[expiry_row + 1 : expiry_row + 1] = strike_rows
+            self._create_row_arrays()
+            self.endInsertRows()
+    
+    def expiry_row(self, expiry):
+        for row_idx, row in enumerate(self.rows):
+            if row[0] == expiry and row[1] is None:
+                return row_idx
+        raise KeyError(f"Expiry {expiry} is not in the table")
+    
+    def _create_row_arrays(self):
+        n_rows = len(self.rows)
+        self.row_call_idx = np.array([row[2] for row in self.rows], dtype=int).reshape(n_rows)
+        self.row_put_idx = np.array([row[3] for row in self.rows], dtype=int).reshape(n_rows)
+        self.strike_rows = np.flatnonzero(self.row_call_idx >= 0)
+        self.values = np.full((n_rows, self.metric_cols.size), np.nan)
+        self.fallback = np.zeros((n_rows, self.metric_cols.size), dtype=bool)
+        self.text = np.full((n_rows, self.n_cols), None, dtype=object)
+        for row_idx, (expiry, strike, _, _, call_name, put_name) in enumerate(self.rows):
+            if strike is None:
+                self.text[row_idx, self.name_cols] = datetime.fromtimestamp(expiry).strftime("%d-%b-%y")
+            else:
+                self.text[row_idx, 0] = call_name
+                self.text[row_idx, self.n_data_cols] = str(strike)
+                self.text[row_idx, self.n_data_cols + 1] = put_name
+                self.text[row_idx, self.metric_cols] = "nan"
+    
+    def _gather(self, option_book):
+        call_idx, put_idx = self.row_call_idx[self.strike_rows], self.row_put_idx[self.strike_rows]
+        call_ivol, put_ivol = option_book.ivol[2, call_idx], option_book.ivol[2, put_idx]
+        call_fallback = np.isnan(call_ivol) & ~option_book.OTM[call_idx]
+        put_fallback = np.isnan(put_ivol) & ~option_book.OTM[put_idx]
+        
+        values = np.column_stack((option_book.bid[call_idx], option_book.ask[call_idx], option_book.mid[call_idx],
+                                  np.where(call_fallback, put_ivol, call_ivol),
+                                  option_book.bid[put_idx], option_book.ask[put_idx], option_book.mid[put_idx],
+                                  np.where(put_fallback, call_ivol, put_ivol)))
+        fallback = np.zeros(values.shape, dtype=bool)
+        fallback[:, 3] = call_fallback & ~np.isnan(put_ivol)
+        fallback[:, 7] = put_fallback & ~np.isnan(call_ivol)
+        return np.round(values, self.decimals), fallback
+    
+    def refresh(self, option_book):
+        if self.strike_rows.size == 0:
+            return
+        values, fallback = self._gather(option_book)
+        changed = ~np.isclose(values, self.values[self.strike_rows], rtol=0, atol=0, equal_nan=True) | (fallback != self.fallback[self.strike_rows])
+        if not changed.any():
+            return
         
-        new_cols=[self.tick_label_engine.x_func(new_val) for new_val in self.column_vals]
-        self.setHorizontalHeaderLabels(new_cols)
+        row_pos, col_pos = np.nonzero(changed)
+        rows, cols = self.strike_rows[row_pos], self.metric_cols[col_pos]
+        for row_idx, col_idx, value, is_fallback in zip(rows.tolist(), cols.tolist(), values[row_pos, col_pos].tolist(), fallback[row_pos, col_pos].tolist()):
+            self.text[row_idx, col_idx] = f"{value}*" if is_fallback else str(value)
+        self.values[self.strike_rows] = values
+        self.fallback[self.strike_rows] = fallback
         
-        new_rows=[self.tick_label_engine.y_func(new_val) for new_val in self.row_vals]
-        self.setVerticalHeaderLabels(new_rows)
+        changed_cells = np.zeros(self.text.shape, dtype=bool)
+        changed_cells[rows, cols] = True
+        for top, bottom, left, right in VolTableModel.changed_regions(changed_cells):
+            self.dataChanged.emit(self.index(top, left), self.index(bottom, right), [QtCore.Qt.DisplayRole])
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+    
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self.n_cols
+    
+    def flags(self, index):
+        if self.row_call_idx[index.row()] < 0 and not index.column() in self.name_cols:
+            return QtCore.Qt.ItemIsEnabled
+        return QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsEnabled
+    
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        expiry_row = self.row_call_idx[row] < 0
+        if role == QtCore.Qt.DisplayRole:
+            return self.text[row, col]
+        if role == QtCore.Qt.BackgroundRole:
+            return self.brushes["grey"] if expiry_row else self.brushes["black"]
+        if role == QtCore.Qt.ForegroundRole:
+            if col == self.n_data_cols or (expiry_row and col in self.name_cols):
+                return self.brushes["white"]
+            return self.brushes["orange"]
+        if role == QtCore.Qt.TextAlignmentRole:
+            if col in self.name_cols:
+                return QtCore.Qt.AlignLeft
+            if col == self.n_data_cols:
+                return QtCore.Qt.AlignCenter
+            return QtCore.Qt.AlignRight
+        if role == QtCore.Qt.FontRole:
+            return self.cell_font
+        return None
+    
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation != QtCore.Qt.Horizontal:
+            return None
+        if role == QtCore.Qt.DisplayRole:
+            return self.column_names[section]
+        if role == QtCore.Qt.BackgroundRole:
+            return self.brushes["header"]
+        if role == QtCore.Qt.ForegroundRole:
+            return self.brushes["white"]
+        if role == QtCore.Qt.TextAlignmentRole:
+            return QtCore.Qt.AlignLeft if section in self.name_cols else QtCore.Qt.AlignCenter
+        if role == QtCore.Qt.FontRole:
+            return self.name_header_font if section in self.name_cols else self.header_font
+        return None
 
 
 class OptionMonitorTable(QtWidgets.QWidget):
     def __init__(self, instrument_manager, parent=None):
         super().__init__(parent)
         self.instrument_manager=instrument_manager
-        self.KT_instrument_obj_map = {}
-        self.instrument_obj_textitem_maps = {}        
+        self.option_book_snapshot=None
         self.data_cols = ['Instrument Name', 'Bid', 'Ask', 'Mid', "IVOL"]
         self.n_data_cols = len(self.data_cols)
 
         self.default_strikes = 5
         self.n_strikes_per_expiry = {}
         self.expiry_strike_map = {}
-        self.idx_text_item = {}
         self.expiry_combobox_map = {}
         self.max_strikes_per_expiry = {expiry : len(strike_arr) for expiry, strike_arr in self.instrument_manager.options_maps.expiry_strike_map.items()}
         
@@ -93,24 +299,10 @@ class OptionMonitorTable(QtWidgets.QWidget):
         self.strike_center = 0.5 * (np.amin(all_strikes) + np.amax(all_strikes))
         
         self.n_strikes_per_expiry = {expiry : self.default_strikes if n_strikes >= self.default_strikes else n_strikes for expiry, n_strikes in self.max_strikes_per_expiry.items()}
-        self.row_start_idx_per_expiry = {}
-        
-        cum_row_idx = 0
-        for idx, (expiry, n_strikes) in enumerate(self.n_strikes_per_expiry.items()):
-            if idx == 0:
-                self.row_start_idx_per_expiry[expiry] = 0
-            else:
-                self.row_start_idx_per_expiry[expiry] = cum_row_idx
-            
-            cum_row_idx += 1 + n_strikes
-            
-        self.n_rows_option_table = 1 + cum_row_idx
-        self.n_cols_option_table = 1 + 2 * len(self.data_cols)
                 
         self.v_layout = QtWidgets.QVBoxLayout(self)
         
-        self.metric_columns = [metric.lower() for metric in self.data_cols[1:]]
-        self._subsample_instrument_manager()
+        self.option_model = OptionMonitorModel(self.data_cols, parent=self)
         self.setup_parent_table(self.data_cols)
         self.create_child_table_rows()
 
@@ -127,9 +319,9 @@ class OptionMonitorTable(QtWidgets.QWidget):
         strike_arr.sort()
         return strike_arr
 
-    def _create_strike_put_call_object_dict(self, expiry, strike_arr):
-        strike_put_call_object_dict = {}
-        
+    def _create_strike_rows(self, expiry, strike_arr):
+        name_index_map = self.instrument_manager.options_maps.name_index_map
+        strike_rows = []
         for strike in strike_arr:
             instrument_list = self.instrument_manager.options_maps.expiry_strike_instrument_map[expiry][strike]
             
@@ -137,39 +329,13 @@ class OptionMonitorTable(QtWidgets.QWidget):
                 raise KeyError(f"No put-call pair for {instrument_list[0]}")
             
             instrument_name = instrument_list[0]
-            
-            option_object = self.instrument_manager.options[instrument_name]
-            self.instrument_manager_subsampled.options[instrument_name] = option_object
-            if option_object.flag_int == 1:
-                put_name = self.instrument_manager.options_maps.put_call_map[instrument_name]
-                put_object = self.instrument_manager.options[put_name]
-                
-                self.instrument_manager_subsampled.options[put_name] = put_object
-                strike_put_call_object_dict[strike] = {"call" : option_object,
-                                                            "put": put_object}
+            pair_name = self.instrument_manager.options_maps.put_call_map[instrument_name]
+            if self.instrument_manager.options[instrument_name].flag_int == 1:
+                call_name, put_name = instrument_name, pair_name
             else:
-                call_name = self.instrument_manager.options_maps.put_call_map[instrument_name]
-                call_object = self.instrument_manager.options[call_name]
-                self.instrument_manager_subsampled.options[call_name] = call_object
-
-                strike_put_call_object_dict[strike] = {"call" : call_object,
-                                                            "put": option_object}
-        return strike_put_call_object_dict 
-    
-    def _subsample_instrument_manager(self):
-        self.instrument_manager_subsampled = copy.deepcopy(self.instrument_manager)
-        self.instrument_manager_subsampled.options = {}
-        
-        self.expiry_strike_put_call_object = {}
-        
-        for expiry, strike_arr in self.instrument_manager.options_maps.expiry_strike_map.items():
-            strike_arr = self._get_closest_n_strikes(strike_arr, self.n_strikes_per_expiry[expiry])
-            self.expiry_strike_map[expiry] = strike_arr 
-            strike_put_call_object_dict = self._create_strike_put_call_object_dict(expiry, strike_arr)
-
-            self.expiry_strike_put_call_object[expiry] = strike_put_call_object_dict
-                        
-        self.instrument_manager_subsampled.update_option_attr_maps()
+                call_name, put_name = pair_name, instrument_name
+            strike_rows.append((expiry, strike, name_index_map[call_name], name_index_map[put_name], call_name, put_name))
+        return strike_rows
     
     def _create_header_title(self, category):
         label = QtWidgets.QLabel(category)
@@ -200,7 +366,8 @@ class OptionMonitorTable(QtWidgets.QWidget):
     
     def setup_parent_table(self, data_cols):
         self.header_layout=self._create_header_tables()
-        self.option_table = QtWidgets.QTableWidget()
+        self.option_table = QtWidgets.QTableView()
+        self.option_table.setModel(self.option_model)
         self.option_table.setShowGrid(False)
         self.option_table.verticalHeader().setVisible(False)
         self.option_table.horizontalHeader().setVisible(True)
@@ -214,10 +381,10 @@ class OptionMonitorTable(QtWidgets.QWidget):
                                                     border-left: 2px solid #414141;
                                                     border-right: 2px solid #414141;
                                                     }
-                                        QTableWidget::item:selected {background-color: #414141;
+                                        QTableView::item:selected {background-color: #414141;
                                                                     }
                                         
-                                        QTableWidgetItem {
+                                        QTableView::item {
                                             border-radius: 0px; 
                                             border: 1px solid black;
                                         }
@@ -228,20 +395,6 @@ class OptionMonitorTable(QtWidgets.QWidget):
         self.option_table.horizontalHeader().setSectionsClickable(True)
         self.option_table.setAutoFillBackground(False)
         
-        self.option_table.setRowCount(self.n_rows_option_table)
-        self.option_table.setColumnCount(self.n_cols_option_table)
-        
-        column_names = data_cols  + [""] + data_cols
-
-        for idx, col in enumerate(column_names):
-            col_item = tables_utils.TableColumnItem(col)
-            if idx == 0 or idx == len(data_cols) + 1:
-                col_item.setTextAlignment(QtCore.Qt.AlignLeft)
-                font = QtGui.QFont("Neue Haas Grotesk", 14)
-                col_item.setFont(font)
-                
-            self.option_table.setHorizontalHeaderItem(idx, col_item)
-        
         header = self.option_table.horizontalHeader()
         header.sectionResized.connect(self.update_header_stretch)
         
@@ -259,139 +412,41 @@ class OptionMonitorTable(QtWidgets.QWidget):
         #self.header_layout.setStretch(1, strikes_width)
         self.header_layout.setStretch(2, sum_puts)
         
-    def update_table(self):
-        self.blockSignals(True)
-        self.setUpdatesEnabled(False)        
-        for instrument_name, option_object in self.instrument_manager_subsampled.options.items():
-            if instrument_name in self.instrument_obj_textitem_maps:
-                text_item_dict = self.instrument_obj_textitem_maps[instrument_name]
-                for metric, text_item in text_item_dict.items(): 
-                    val = getattr(option_object, metric)
-                    if metric == "ivol":
-                        val = val[2]
-                        if val != val and not option_object.OTM:
-                            if option_object.flag_int == 1:
-                                put_instrument_name = self.instrument_manager_subsampled.options_maps.put_call_map[instrument_name]
-                                val = self.instrument_manager_subsampled.options[put_instrument_name].ivol[2]
-                                text_item.setText(f"{(np.round(val, 2))}*")
-                                continue
-                                
-                    text_item.setText(str(np.round(val, 2)))
-            else:
-                print(f"\n{instrument_name} not in self.instrument_obj_textitem_maps")
-                
-
-        self.blockSignals(False)
-        self.setUpdatesEnabled(True)        
+    def update_table(self, option_book_snapshot=None):
+        if not option_book_snapshot is None:
+            self.option_book_snapshot = option_book_snapshot
+        if not self.option_book_snapshot is None:
+            self.option_model.refresh(self.option_book_snapshot)
 
-    def _create_text_item_expiry(self, expiry):
-        text_item = tables_utils.OptionExpiryCellItem(datetime.fromtimestamp(expiry).strftime("%d-%b-%y"))
-        font_call = text_item.font()
-        font_call.setPointSize(12)
-        text_item.setFont(font_call)
-        return text_item
-    
     def change_center(self, center):
         center = float(center)
         self.strike_center = center
-        
-        
-        self.create_child_table_rows()
-        
-    def _create_text_item_instrument_name(self, expiry, strike, option_type):
-        option_object = self.expiry_strike_put_call_object[expiry][strike][option_type]
-        text_item = tables_utils.OptionNameCellItem(str(option_object.instrument_name))
-        return text_item, option_object
-    
-    def _create_text_item_metric(self, metric, option_object):
-        metric_value = getattr(option_object, metric)
-        if metric == "ivol":
-            metric_value = metric_value[2]
-        if metric_value != metric_value:
-            metric_value=str(metric_value)
-        else:
-            metric_value=str(np.round(metric_value,2 ))
-        text_item = tables_utils.OptionMetricCellItem(metric_value)
-        return text_item
-    
-    def _create_expiry_row_text_items(self, option_table, expiry, idx_expiry, n_strikes):
-        text_item_call = self._create_text_item_expiry(expiry)
-        text_item_put = self._create_text_item_expiry(expiry)
-                
-        option_table.setItem(idx_expiry, 0, text_item_call)
-        option_table.setItem(idx_expiry, self.n_data_cols + 1, text_item_put)
-        
-        for k, _ in enumerate(self.metric_columns):
-            blank_text_item1 = tables_utils.BlankCellItem()
-            blank_text_item2 = tables_utils.BlankCellItem()
-            option_table.setItem(idx_expiry, 1 + k , blank_text_item1)
-            option_table.setItem(idx_expiry, 1 + self.n_data_cols + 1 + k , blank_text_item2)
-
-    def _create_strike_row_text_items(self, option_table, expiry, strike, idx_expiry, idx_strike):
-        
-        name_text_item_call, call_object = self._create_text_item_instrument_name(expiry, strike, "call")
-        name_text_item_put, put_object = self._create_text_item_instrument_name(expiry, strike, "put")
-
-        text_item_strike = tables_utils.OptionMetricCellItem(str(strike))
-        text_item_strike.setTextAlignment(QtCore.Qt.AlignCenter)
-        text_item_strike.setForeground(QtGui.QBrush("white"))
-        
-        option_table.setItem(idx_expiry + idx_strike, 0, name_text_item_call)
-        option_table.setItem(idx_expiry + idx_strike, self.n_data_cols, text_item_strike)
-        option_table.setItem(idx_expiry + idx_strike, self.n_data_cols + 1, name_text_item_put)
-        
-        return call_object, put_object
-
-    def _create_metric_row_text_item(self, option_table, call_object, put_object, metric, idx_expiry, idx_strike, jdx_metric):
-        text_item_call = self._create_text_item_metric(metric, call_object)
-        text_item_put = self._create_text_item_metric(metric, put_object)
-        
-        option_table.setItem(idx_expiry + idx_strike, jdx_metric, text_item_call)
-        option_table.setItem(idx_expiry + idx_strike, jdx_metric + self.n_data_cols + 1, text_item_put)
-        
-        return text_item_call, text_item_put
+        for expiry in self.expiry_strike_map:
+            self._set_expiry_strikes(expiry, self.n_strikes_per_expiry[expiry])
+        self.update_table()
     
     def create_child_table_rows(self):
-        self.idx_text_item = []
-
-        for expiry, strikes_arr in self.expiry_strike_map.items():
-            idx_expiry = self.row_start_idx_per_expiry[expiry]
-            
-            select_strikes_combobox = self.create_combobox(idx_expiry, len(strikes_arr), self.max_strikes_per_expiry[expiry], expiry)
-            self.option_table.setCellWidget(idx_expiry, self.n_data_cols, select_strikes_combobox)
-
-            self._create_expiry_row_text_items(self.option_table, expiry, idx_expiry, len(strikes_arr))
-            
-            for idx_strike, strike in enumerate(strikes_arr, start=1):                
-                call_object, put_object = self._create_strike_row_text_items(self.option_table, expiry, strike, idx_expiry, idx_strike)
-                call_metric_dict = {}
-                put_metric_dict = {}
-                
-                for jdx_metric, metric in enumerate(self.metric_columns, start=1):
-                    text_item_call, text_item_put = self._create_metric_row_text_item(self.option_table, call_object, put_object, metric, idx_expiry, idx_strike, jdx_metric)
-                    call_metric_dict[metric] = text_item_call
-                    put_metric_dict[metric] = text_item_put
-
-                self.instrument_obj_textitem_maps[call_object.instrument_name] = call_metric_dict
-                self.instrument_obj_textitem_maps[put_object.instrument_name] = put_metric_dict
-
-    def update_child_table_rows(self, expiry_update):
-        for expiry, strikes_arr in self.expiry_strike_map.items():
-            if expiry == expiry_update:
-                idx_expiry = self.row_start_idx_per_expiry[expiry]
-                self._create_expiry_row_text_items(self.option_table, expiry, idx_expiry, len(strikes_arr))
-                for idx_strike, strike in enumerate(strikes_arr, start=1):                
-                    call_object, put_object = self._create_strike_row_text_items(self.option_table, expiry, strike, idx_expiry, idx_strike)
-                    call_metric_dict = {}
-                    put_metric_dict = {}
-                    
-                    for jdx_metric, metric in enumerate(self.metric_columns, start=1):
-                        text_item_call, text_item_put = self._create_metric_row_text_item(self.option_table, call_object, put_object, metric, idx_expiry, idx_strike, jdx_metric)
-                        call_metric_dict[metric] = text_item_call
-                        put_metric_dict[metric] = text_item_put
-
-                    self.instrument_obj_textitem_maps[call_object.instrument_name] = call_metric_dict
-                    self.instrument_obj_textitem_maps[put_object.instrument_name] = put_metric_dict
+        rows = []
+        for expiry, strike_arr in self.instrument_manager.options_maps.expiry_strike_map.items():
+            strike_arr = self._get_closest_n_strikes(strike_arr, self.n_strikes_per_expiry[expiry])
+            self.expiry_strike_map[expiry] = strike_arr
+            rows.append((expiry, None, -1, -1, None, None))
+            rows.extend(self._create_strike_rows(expiry, strike_arr))
+        self.option_model.set_rows(rows)
+        
+        for expiry, strike_arr in self.expiry_strike_map.items():
+            idx_expiry = self.option_model.expiry_row(expiry)
+            select_strikes_combobox = self.create_combobox(idx_expiry, len(strike_arr), self.max_strikes_per_expiry[expiry], expiry)
+            self.option_table.setIndexWidget(self.option_model.index(idx_expiry, self.n_data_cols), select_strikes_combobox)
+        self.update_table()
+        
+    def _set_expiry_strikes(self, expiry, n_strikes):
+        strike_arr = self._get_closest_n_strikes(self.instrument_manager.options_maps.expiry_strike_map[expiry], n_strikes)
+        self.n_strikes_per_expiry[expiry] = n_strikes
+        self.expiry_strike_map[expiry] = strike_arr
+        self.option_model.replace_expiry_rows(expiry, self._create_strike_rows(expiry, strike_arr))
+        for exp, combobox in self.expiry_combobox_map.items():
+            combobox.table_idx = self.option_model.expiry_row(exp)
                     
     def create_combobox(self, idx, default_n_strikes, max_n_strikes, expiry):
         combobox = tables_utils.StrikeOptionsComboBox(strikes=max_n_strikes,
@@ -406,90 +461,16 @@ class OptionMonitorTable(QtWidgets.QWidget):
         
         combobox.currentTextChanged.connect(lambda selected_text: self.change_strikes(selected_text, combobox))
         return combobox
-    
-    def add_strikes(self, new_n_strikes, expiry, combobox):
-        total_strikes_4_expiry = self.instrument_manager.options_maps.expiry_strike_map[expiry]
-        self.n_strikes_per_expiry[expiry] = new_n_strikes
-        
-        instruments_to_remove = self.instrument_manager_subsampled.options_maps.expiry_instrument_map[expiry]
-        for instrument_name in instruments_to_remove:
-            del self.instrument_manager_subsampled.options[instrument_name]
-
-        strike_arr = self._get_closest_n_strikes(total_strikes_4_expiry, new_n_strikes)
-        self.expiry_strike_map[expiry] = strike_arr 
-        strike_put_call_object_dict = self._create_strike_put_call_object_dict(expiry, strike_arr)
-
-        self.expiry_strike_put_call_object[expiry] = strike_put_call_object_dict
-        n_strike_increase = new_n_strikes - combobox.current_n_strikes
-        
-        if n_strike_increase > 0:
-            for i in range(n_strike_increase):
-                self.option_table.insertRow(combobox.table_idx+1)
-
-        for exp in self.row_start_idx_per_expiry:
-            if exp > expiry:
-                self.row_start_idx_per_expiry[exp] += n_strike_increase
-                self.expiry_combobox_map[exp].table_idx += n_strike_increase
-        
-        self.instrument_manager_subsampled.update_option_attr_maps()
-        self.update_child_table_rows(expiry)
-    
-    def remove_strikes(self, new_n_strikes, expiry, combobox):
-        n_strike_decrease = combobox.current_n_strikes - new_n_strikes
-        current_strikes = list(self.expiry_strike_put_call_object[expiry])
-        current_strikes = np.sort(current_strikes)
-        
-        sorted_idx = np.argsort((current_strikes - self.strike_center))
-        
-        idx_to_keep = sorted_idx[:new_n_strikes]
-        idx_to_remove = sorted_idx[new_n_strikes:]
-
-        strikes_to_keep = current_strikes[idx_to_keep]
-        strikes_to_remove = current_strikes[idx_to_remove]
-        self.expiry_strike_map[expiry] = strikes_to_keep
-        
-        for strike in strikes_to_remove:
-            for instrument_name in self.instrument_manager.options_maps.expiry_strike_instrument_map[expiry][strike]:
-                del self.instrument_manager_subsampled.options[instrument_name]
-
-            del self.expiry_strike_put_call_object[expiry][strike]
-        self.instrument_manager_subsampled.update_option_attr_maps()
-        idx_to_remove.sort()
-        idx_to_remove = idx_to_remove[::-1]
-        for idx in idx_to_remove:
-            self.option_table.removeRow(combobox.table_idx + 1 + idx)
-        
-        for exp in self.row_start_idx_per_expiry:
-            if exp > expiry:
-                self.row_start_idx_per_expiry[exp] -= n_strike_decrease
-                self.expiry_combobox_map[exp].table_idx -= n_strike_decrease
 
     def change_strikes(self, new_n_strikes, combobox):
         new_n_strikes = int(float(new_n_strikes))
-        self.option_table.blockSignals(True)
-        self.option_table.setUpdatesEnabled(False)
         if new_n_strikes == combobox.current_n_strikes:
             return
-        else:
-            expiry = combobox.expiry
-            if new_n_strikes > combobox.current_n_strikes:
-                self.add_strikes(new_n_strikes, expiry, combobox)
-            else:
-                self.remove_strikes(new_n_strikes, expiry, combobox)
-        
-            combobox.current_n_strikes = new_n_strikes
-        
-        self.option_table.blockSignals(False)
-        self.option_table.setUpdatesEnabled(True)
+        self._set_expiry_strikes(combobox.expiry, new_n_strikes)
+        combobox.current_n_strikes = new_n_strikes
+        self.update_table()
         
     def bulk_change_strike_num(self, new_strike):
         for expiry, combobox in self.expiry_combobox_map.items():
             if new_strike <= self.max_strikes_per_expiry[expiry]:
                 combobox.currentTextChanged.emit(str(new_strike))  
-                
-                
-                
-                
-                
-            
-        
\ No newline at end of file
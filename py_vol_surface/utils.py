@@ -1,8 +1,19 @@
 import numpy as np
+import bisect
+import json
 from dataclasses import dataclass
+from multiprocessing import shared_memory
 import time
 from datetime import datetime
 import numpy as np
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
 
 
 class CustomDatetime:
@@ -44,6 +55,13 @@ class websocket_json_names:
     ask_key: str
     timestamp_key: str
 
+@dataclass(slots=True)
+class Tick:
+    instrument_name: str
+    bid: float
+    ask: float
+    timestamp: float
+
 def create_websocket_json_formatter(instrument_identifier_name, bid_name, ask_name, timestamp_name):
     websocket_json_format = {"instrument_key" : instrument_identifier_name,
                              "bid_key" : bid_name,
@@ -52,8 +70,48 @@ def create_websocket_json_formatter(instrument_identifier_name, bid_name, ask_na
                              }
     return websocket_json_format
 
+class YearFractionClock:
+    day_count_seconds = {"ACT/365" : 365 * 86400,
+                         "ACT/365.25" : 365.25 * 86400,
+                         "ACT/360" : 360 * 86400}
+    
+    def __init__(self, day_count="ACT/365"):
+        self._expiry_idx_map = {}
+        self.expiries = np.empty(0)
+        self.now = time.time()
+        self.set_day_count(day_count)
+        
+    def set_day_count(self, day_count):
+        if not day_count in self.day_count_seconds:
+            raise ValueError(f"Unknown day count convention {day_count}, must be one of {list(self.day_count_seconds)}")
+        self.day_count = day_count
+        self.seconds_per_year = self.day_count_seconds[day_count]
+        self.yte = self.year_fraction(self.expiries)
+        
+    def tick(self, now=None):
+        self.now = time.time() if now is None else now
+        self.yte = self.year_fraction(self.expiries)
+    
+    def register_expiries(self, expiries):
+        unique_expiries, inverse = np.unique(np.asarray(expiries, dtype=float), return_inverse=True)
+        unique_idx = np.empty(unique_expiries.size, dtype=int)
+        for jdx, expiry in enumerate(unique_expiries):
+            key = None if np.isnan(expiry) else float(expiry)
+            if not key in self._expiry_idx_map:
+                self._expiry_idx_map[key] = len(self._expiry_idx_map)
+            unique_idx[jdx] = self._expiry_idx_map[key]
+        self.expiries = np.array([np.nan if key is None else key for key in self._expiry_idx_map], dtype=float)
+        self.yte = self.year_fraction(self.expiries)
+        return unique_idx[inverse.ravel()]
+        
+    def year_fraction(self, expiry):
+        return (expiry - self.now) / self.seconds_per_year
+
+
+year_fraction_clock = YearFractionClock()
+
 def convert_unix_maturity_to_years(unix_maturity):
-    return (unix_maturity - time.time()) / 3600 / 24 / 365
+    return year_fraction_clock.year_fraction(unix_maturity)
 
 
 class BiDict:
@@ -114,4 +172,357 @@ class BiDict:
 
     def __repr__(self):
         """Return a string representation of the BiDict."""
-        return f"BiDict(type1_to_type2={self._type1_to_type2}, type2_to_type1={self._type2_to_type1})"
\ No newline at end of file
+        return f"BiDict(type1_to_type2={self._type1_to_type2}, type2_to_type1={self._type2_to_type1})"
+
+class TickRingBuffer:
+    """
+    Preallocated single-producer/single-consumer ring of parsed ticks. The producer owns head and the
+    consumer owns tail, so push() and drain() need no lock as long as each side stays on one thread.
+    A full ring drops the new tick rather than overwrite unread ones (counted in n_dropped).
+    Streamers that push from several threads must use a TickRingGroup, one ring per thread.
+    """
+    tick_dtype = np.dtype([("index", np.int64),
+                           ("bid", np.float64),
+                           ("ask", np.float64),
+                           ("timestamp", np.float64)])
+    
+    def __init__(self, instrument_names, capacity=65536):
+        self.instrument_names = list(instrument_names)
+        self.name_index_map = {instrument_name : idx for idx, instrument_name in enumerate(self.instrument_names)}
+        self.capacity = capacity
+        self.ticks = np.zeros(capacity, dtype=self.tick_dtype)
+        self._head = 0
+        self._tail = 0
+        self.n_dropped = 0
+    
+    def __len__(self):
+        return self._head - self._tail
+    
+    def push(self, index, bid, ask, timestamp):
+        head = self._head
+        if head - self._tail >= self.capacity:
+            self.n_dropped += 1
+            return False
+        self.ticks[head % self.capacity] = (index, bid, ask, timestamp)
+        self._head = head + 1
+        return True
+    
+    def push_by_name(self, instrument_name, bid, ask, timestamp):
+        return self.push(self.name_index_map[instrument_name], bid, ask, timestamp)
+    
+    def drain(self):
+        tail, head = self._tail, self._head
+        if head == tail:
+            return self.ticks[:0].copy()
+        start, stop = tail % self.capacity, head % self.capacity
+        if start < stop:
+            ticks = self.ticks[start:stop].copy()
+        else:
+            ticks = np.concatenate((self.ticks[start:], self.ticks[:stop]))
+        self._tail = head
+        return ticks
+    
+    @staticmethod
+    def last_per_instrument(ticks):
+        reversed_ticks = ticks[::-1]
+        _, last_idx = np.unique(reversed_ticks["index"], return_index=True)
+        return reversed_ticks[last_idx]
+
+
+class TickRingGroup:
+    """
+    One TickRingBuffer per producer thread over the same instruments, so every ring keeps a single
+    producer and stays lock-free. drain() concatenates the rings in producer order; an instrument should
+    only be pushed by one producer for last_per_instrument to pick its latest tick.
+    """
+    def __init__(self, instrument_names, producer_names, capacity=65536):
+        self.rings = {producer_name : TickRingBuffer(instrument_names, capacity) for producer_name in producer_names}
+        first_ring = next(iter(self.rings.values()))
+        self.instrument_names = first_ring.instrument_names
+        self.name_index_map = first_ring.name_index_map
+    
+    def __len__(self):
+        return sum(len(ring) for ring in self.rings.values())
+    
+    @property
+    def n_dropped(self):
+        return sum(ring.n_dropped for ring in self.rings.values())
+    
+    def ring(self, producer_name):
+        return self.rings[producer_name]
+    
+    def drain(self):
+        return np.concatenate([ring.drain() for ring in self.rings.values()])
+
+
+class OrderBookSide:
+    """
+    One side of a price level book: a sorted list of keys (the prices, negated for asks) and a key -> size
+    dict. The best level is always the last key, so top of book is O(1), a level is found by hashing or
+    bisecting and only levels that appear or disappear touch the sorted list. Prices are compared as
+    floats, not as the exchange's strings.
+    """
+    def __init__(self, is_bid):
+        self.is_bid = is_bid
+        self._sign = 1. if is_bid else -1.
+        self.keys = []
+        self.sizes = {}
+    
+    def __len__(self):
+        return len(self.keys)
+    
+    @property
+    def best_price(self):
+        return self._sign * self.keys[-1] if self.keys else np.nan
+    
+    @property
+    def best_size(self):
+        return self.sizes[self.keys[-1]] if self.keys else np.nan
+    
+    def levels(self):
+        keys = np.array(self.keys[::-1], dtype=float)
+        return self._sign * keys, np.array([self.sizes[key] for key in self.keys[::-1]], dtype=float)
+    
+    def set_levels(self, levels):
+        sign = self._sign
+        self.sizes = {sign * float(price) : float(size) for price, size in levels if float(size) > 0}
+        self.keys = sorted(self.sizes)
+    
+    def update_level(self, price, size):
+        key = self._sign * price
+        if size == 0:
+            if key in self.sizes:
+                del self.sizes[key]
+                del self.keys[bisect.bisect_left(self.keys, key)]
+        else:
+            if not key in self.sizes:
+                bisect.insort(self.keys, key)
+            self.sizes[key] = size
+    
+    def apply(self, levels):
+        for price, size in levels:
+            self.update_level(float(price), float(size))
+
+
+class OrderBook:
+    def __init__(self):
+        self.bids = OrderBookSide(True)
+        self.asks = OrderBookSide(False)
+    
+    @property
+    def best_bid(self):
+        return self.bids.best_price
+    
+    @property
+    def best_ask(self):
+        return self.asks.best_price
+    
+    def snapshot(self, bids, asks):
+        self.bids.set_levels(bids)
+        self.asks.set_levels(asks)
+    
+    def update(self, bids, asks):
+        self.bids.apply(bids)
+        self.asks.apply(asks)
+
+
+class SharedQuoteTable:
+    """
+    Bid/ask/timestamp per instrument in a multiprocessing.shared_memory block, written by an ingestion
+    process and read by the PriceProcessor's process. Each row carries a seqlock counter: the writer bumps
+    it to odd before writing and back to even after, and drain() only returns rows whose counter was even
+    and unchanged across the copy and has moved since the previous drain. Pickling attaches to the block.
+    """
+    row_dtype = np.dtype([("seq", np.int64),
+                          ("bid", np.float64),
+                          ("ask", np.float64),
+                          ("timestamp", np.float64)])
+    
+    def __init__(self, instrument_names, shm_name=None):
+        self.instrument_names = list(instrument_names)
+        self.name_index_map = {instrument_name : idx for idx, instrument_name in enumerate(self.instrument_names)}
+        n_rows = len(self.instrument_names)
+        self._owner = shm_name is None
+        self.shm = shared_memory.SharedMemory(name=shm_name, create=self._owner, size=max(n_rows * self.row_dtype.itemsize, 1))
+        self.rows = np.ndarray(n_rows, dtype=self.row_dtype, buffer=self.shm.buf)
+        if self._owner:
+            self.rows["seq"] = 0
+            self.rows["bid"] = np.nan
+            self.rows["ask"] = np.nan
+            self.rows["timestamp"] = np.nan
+        self._seq = self.rows["seq"]
+        self._bid = self.rows["bid"]
+        self._ask = self.rows["ask"]
+        self._timestamp = self.rows["timestamp"]
+        self._last_seq = np.zeros(n_rows, dtype=np.int64)
+    
+    def __getstate__(self):
+        return {"instrument_names" : self.instrument_names, "shm_name" : self.shm.name}
+    
+    def __setstate__(self, state):
+        self.__init__(state["instrument_names"], state["shm_name"])
+        
+    def push(self, index, bid, ask, timestamp):
+        seq = self._seq[index]
+        self._seq[index] = seq + 1
+        self._bid[index] = bid
+        self._ask[index] = ask
+        self._timestamp[index] = timestamp
+        self._seq[index] = seq + 2
+        return True
+    
+    def push_by_name(self, instrument_name, bid, ask, timestamp):
+        return self.push(self.name_index_map[instrument_name], bid, ask, timestamp)
+    
+    def drain(self):
+        seq_before = self._seq.copy()
+        rows = self.rows.copy()
+        seq_after = self._seq.copy()
+        changed = (seq_before == seq_after) & (seq_after % 2 == 0) & (seq_after != self._last_seq)
+        idx = np.flatnonzero(changed)
+        self._last_seq[idx] = seq_after[idx]
+        
+        ticks = np.empty(idx.size, dtype=TickRingBuffer.tick_dtype)
+        ticks["index"] = idx
+        for column in ("bid", "ask", "timestamp"):
+            ticks[column] = rows[column][idx]
+        return ticks
+    
+    def close(self):
+        self.rows = self._seq = self._bid = self._ask = self._timestamp = None
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+class TickDecoder:
+    """
+    Decodes raw websocket messages straight into a Tick holding only the fields named in
+    websocket_json_format. Each field is read from payload_path + (key,) unless overridden in field_paths.
+    With msgspec the message is decoded into generated structs covering just those paths, otherwise the
+    whole message is parsed by orjson or the stdlib and the paths are walked. decode() returns None for
+    messages without an instrument (heartbeats, subscription acks, ...), loads() parses the full message
+    and tick_from_message() builds the Tick from an already parsed one.
+    """
+    backends = ("msgspec", "orjson", "json")
+    tick_fields = {"instrument_name" : "instrument_key",
+                   "bid" : "bid_key",
+                   "ask" : "ask_key",
+                   "timestamp" : "timestamp_key"}
+    
+    def __init__(self, websocket_json_format, payload_path=(), field_paths=None, backend=None):
+        self._init_args = (websocket_json_format, payload_path, field_paths, backend)
+        self.field_paths = {field : tuple(payload_path) + (websocket_json_format[format_key],) for field, format_key in self.tick_fields.items()}
+        self.field_paths.update({field : tuple(path) for field, path in (field_paths or {}).items()})
+        parent_keys = {}
+        for jdx, field in enumerate(self.tick_fields):
+            path = self.field_paths[field]
+            parent_keys.setdefault(path[:-1], []).append((jdx, path[-1]))
+        self._parent_keys = tuple((parent_path, tuple(keys)) for parent_path, keys in parent_keys.items())
+
+        available_backends = self.available_backends()
+        if backend is None:
+            backend = available_backends[0]
+        if not backend in available_backends:
+            raise ValueError(f"Decoder backend {backend} is not available, must be one of {available_backends}")
+        self.backend = backend
+        
+        if backend == "msgspec":
+            self._attr_paths = {}
+            self._msgspec_decoder = msgspec.json.Decoder(self._build_struct(self._path_tree(), "TickMessage"))
+            self.loads = msgspec.json.Decoder().decode
+            self.decode = self._decode_msgspec
+        elif backend == "orjson":
+            self.loads = orjson.loads
+        else:
+            self.loads = json.loads
+    
+    def __getstate__(self):
+        return {"init_args" : self._init_args}
+    
+    def __setstate__(self, state):
+        self.__init__(*state["init_args"])
+    
+    @classmethod
+    def available_backends(cls):
+        modules = {"msgspec" : msgspec, "orjson" : orjson, "json" : json}
+        return [backend for backend in cls.backends if not modules[backend] is None]
+    
+    def decode(self, message):
+        try:
+            message = self.loads(message)
+        except ValueError:
+            return None
+        return self.tick_from_message(message)
+    
+    def tick_from_message(self, message):
+        try:
+            values = [None] * len(self.tick_fields)
+            for parent_path, keys in self._parent_keys:
+                parent = message
+                for key in parent_path:
+                    parent = parent[key]
+                for jdx, key in keys:
+                    values[jdx] = parent[key]
+            return Tick(values[0], float(values[1]), float(values[2]), float(values[3]))
+        except (KeyError, IndexError, TypeError):
+            return self._tick_from_partial_message(message)
+
+    def _tick_from_partial_message(self, message):
+        values = {}
+        for field, path in self.field_paths.items():
+            value = message
+            for key in path:
+                if not isinstance(value, dict):
+                    value = None
+                    break
+                value = value.get(key)
+            values[field] = value
+        return self._make_tick(values)
+    
+    def _decode_msgspec(self, message):
+        try:
+            decoded = self._msgspec_decoder.decode(message)
+        except msgspec.DecodeError:
+            return None
+        values = {}
+        for field, attr_path in self._attr_paths.items():
+            value = decoded
+            for attr in attr_path:
+                value = getattr(value, attr)
+                if value is None:
+                    break
+            values[field] = value
+        return self._make_tick(values)
+    
+    @staticmethod
+    def _make_tick(values):
+        if values["instrument_name"] is None:
+            return None
+        bid, ask, timestamp = values["bid"], values["ask"], values["timestamp"]
+        return Tick(values["instrument_name"],
+                    np.nan if bid is None else float(bid),
+                    np.nan if ask is None else float(ask),
+                    time.time() if timestamp is None else float(timestamp))
+    
+    def _path_tree(self):
+        tree = {}
+        for field, path in self.field_paths.items():
+            node = tree
+            for key in path[:-1]:
+                node = node.setdefault(key, {})
+            node[path[-1]] = field
+        return tree
+    
+    def _build_struct(self, tree, struct_name, attr_prefix=()):
+        fields, rename = [], {}
+        for jdx, (key, node) in enumerate(tree.items()):
+            attr = f"f{jdx}"
+            rename[attr] = key
+            if isinstance(node, dict):
+                field_type = self._build_struct(node, f"{struct_name}_{attr}", attr_prefix + (attr,))
+            else:
+                field_type = str if node == "instrument_name" else float | str
+                self._attr_paths[node] = attr_prefix + (attr,)
+            fields.append((attr, field_type | None, None))
+        return msgspec.defstruct(struct_name, fields, rename=rename)
@@ -1,14 +1,46 @@
 from PySide6 import QtCore
 import asyncio
+import inspect
+import multiprocessing
 import queue
+import threading
 import time
+import numpy as np
+from py_vol_surface import utils
+from py_vol_surface.instruments import OptionBook
+from py_vol_surface.engines.option_engines.base import GreeksBuffer
+
+
+def run_streamer_process(price_generator, start_ws_func_name, quote_table, websocket_json_format):
+    generator = getattr(price_generator, start_ws_func_name)()
+    if not inspect.isasyncgen(generator):
+        threading.Event().wait()
+        return
+    
+    instrument_key = websocket_json_format["instrument_key"]
+    bid_key = websocket_json_format["bid_key"]
+    ask_key = websocket_json_format["ask_key"]
+    timestamp_key = websocket_json_format["timestamp_key"]
+    async def _write_quotes():
+        async for message in generator:
+            if isinstance(message, utils.Tick):
+                index = quote_table.name_index_map.get(message.instrument_name)
+                if not index is None:
+                    quote_table.push(index, message.bid, message.ask, message.timestamp)
+                continue
+            index = quote_table.name_index_map.get(message[instrument_key])
+            if not index is None:
+                quote_table.push(index, message[bid_key], message[ask_key], message.get(timestamp_key, time.time()))
+    asyncio.run(_write_quotes())
+
 
 class WebsocketWorker(QtCore.QThread):
     update_signal = QtCore.Signal(list, bool)  
 
     def __init__(self, parallel_type=None, ws_transport_method=None, price_generator=None,
                  start_ws_func_name="", q=None, multiple_levels=False,
-                 timer_ws_response=2, bulk_response=False):
+                 timer_ws_response=2, bulk_response=False, instrument_key=None,
+                 coalesce_interval=0.1, coalesce_max_size=1000, websocket_json_format=None):
         super().__init__()
         self._is_running = True  
         self.parallel_type=parallel_type
@@ -25,31 +57,88 @@ class WebsocketWorker(QtCore.QThread):
         self.multiple_levels=multiple_levels
         self.ws_transport_method=ws_transport_method
         self.generator_call = getattr(self.price_generator, start_ws_func_name)            
+        self.instrument_key=instrument_key
+        self.coalesce_interval=coalesce_interval
+        self.coalesce_max_size=coalesce_max_size
+        self._pending_responses = {}
+        self._last_flush = time.time()
+        self.n_received = 0
+        self.n_coalesced = 0
+        self.n_batches = 0
+        self.websocket_json_format=websocket_json_format
+        self.streamer_process=None
         
-        if self.ws_transport_method == "queue":
+        if self.ws_transport_method in ["queue", "shared_memory"]:
             self.queue_timer = QtCore.QTimer()
             self.queue_timer.timeout.connect(self.get_queue)
             self.queue_timer.start(self.timer_ws_response * 1000)
     
     def get_queue(self):
-        all_responses = []
+        if isinstance(self.q, (utils.TickRingBuffer, utils.TickRingGroup, utils.SharedQuoteTable)):
+            ticks = self.q.drain()
+            self.n_received += ticks.size
+            if ticks.size > 0:
+                self.n_batches += 1
+                self.update_signal.emit([ticks], True)
+            return
         while True:
             try:
                 response = self.q.get_nowait()
-                all_responses.append(response)
+                self._coalesce(response)
             except queue.Empty:
                 break 
-        if len(all_responses) > 0:
-            self.update_signal.emit(all_responses, True)
+        self.flush()
+    
+    def _coalesce(self, response):
+        self.n_received += 1
+        if isinstance(response, utils.Tick):
+            key = response.instrument_name
+        else:
+            key = response[self.instrument_key] if not self.instrument_key is None else self.n_received
+        if key in self._pending_responses:
+            self.n_coalesced += 1
+        self._pending_responses[key] = response
+    
+    def flush(self):
+        self._last_flush = time.time()
+        if len(self._pending_responses) > 0:
+            responses = list(self._pending_responses.values())
+            self._pending_responses = {}
+            self.n_batches += 1
+            self.update_signal.emit(responses, True)
+    
+    def _flush_due(self):
+        return (len(self._pending_responses) >= self.coalesce_max_size
+                or time.time() - self._last_flush >= self.coalesce_interval)
             
     def run_threading(self,):
         self.generator_call()
 
+    async def _flush_periodically(self):
+        while not self._should_stop:
+            await asyncio.sleep(self.coalesce_interval)
+            self.flush()
+
     async def run_async(self,):
-        async for message in self.generator_call():
-            if self._should_stop:  
-                break                
-            self.update_signal.emit([message], False)
+        if not self.coalesce_interval:
+            async for message in self.generator_call():
+                if self._should_stop:  
+                    break                
+                self.n_received += 1
+                self.update_signal.emit([message], False)
+            return
+        
+        flush_task = asyncio.create_task(self._flush_periodically())
+        try:
+            async for message in self.generator_call():
+                if self._should_stop:  
+                    break                
+                self._coalesce(message)
+                if self._flush_due():
+                    self.flush()
+        finally:
+            flush_task.cancel()
+            self.flush()
 
     def run(self):
         match self.parallel_type:
@@ -59,17 +148,40 @@ class WebsocketWorker(QtCore.QThread):
                 loop.run_until_complete(self.run_async())
             case "threading":
                 self.run_threading()
+            case "process":
+                self.run_process()
+    
+    def run_process(self):
+        if not isinstance(self.q, utils.SharedQuoteTable):
+            raise TypeError("parallel_type 'process' requires a utils.SharedQuoteTable as q")
+        self.streamer_process = multiprocessing.get_context("spawn").Process(target=run_streamer_process,
+                                                                            args=(self.price_generator, self.start_ws_func_name,
+                                                                                  self.q, self.websocket_json_format),
+                                                                            daemon=True)
+        self.streamer_process.start()
                             
     def stop(self):
         self._should_stop = True
         self._is_running = False
+        if not self.streamer_process is None:
+            self.streamer_process.terminate()
+            self.streamer_process.join(2)
+        if isinstance(self.q, utils.SharedQuoteTable):
+            self.queue_timer.stop()
+            self.q.close()
         self.quit()
         self.wait()
 
 
 class PriceProcessor:
+    _default_stale_quote_ttl = {"option" : 20, "future" : None, "spot" : None}
+    _transform_price_type_columns = ["ivol", "delta", "standardised_moneyness"]
+    _transform_option_columns = ["moneyness", "log_moneyness"]
+    _change_rtol = 1e-6
+    
     def __init__(self, main_window, axis_transformer, normalisation_engine, instrument_manager, data_container_manager, websocket_json_format, 
-                 interest_rate_config, dividend_rate_config, timer_process_data):
+                 interest_rate_config, dividend_rate_config, timer_process_data, stale_quote_ttl=None, stale_sweep_interval=5,
+                 tick_instrument_names=None):
         self.main_window = main_window
         self.axis_transformer=axis_transformer
         self.normalisation_engine=normalisation_engine
@@ -78,43 +190,188 @@ class PriceProcessor:
         self.interest_rate_config=interest_rate_config
         self.dividend_rate_config=dividend_rate_config
         self.last_buffer_responses={}
+        self.tick_instrument_names=tick_instrument_names
+        self._pending_ticks=np.empty(0, dtype=utils.TickRingBuffer.tick_dtype)
         self.last_process_update=time.time()
         self.timer_process_data=timer_process_data
         self.ws_instrument_key = websocket_json_format["instrument_key"]
         self.ws_bid_key = websocket_json_format["bid_key"]
         self.ws_ask_key = websocket_json_format["ask_key"]
         self.ws_timestamp_key = websocket_json_format["timestamp_key"]
-        self._last_update_checker_timer=time.time()
+        self.stale_quote_ttl = {**self._default_stale_quote_ttl, **(stale_quote_ttl or {})}
+        self.stale_sweep_interval = stale_sweep_interval
+        self.n_stale = 0
+        self._greeks_buffer = GreeksBuffer.empty((len(OptionBook.price_type_idx_map), instrument_manager.option_book.n_options))
+        self._dirty_idx = set()
+        self._moved_underlyings = set()
+        self._underlying_engine_groups = {}
+        self.n_dirty = 0
+        self.n_underlying_repriced = 0
     
-    def update_price(self, websocket_response,):
-        instrument_name = websocket_response[self.ws_instrument_key]
+    def update_price(self, websocket_response, batch_options=False):
+        if isinstance(websocket_response, utils.Tick):
+            return self.update_instrument_price(websocket_response.instrument_name, websocket_response.bid, websocket_response.ask, batch_options)
+        return self.update_instrument_price(websocket_response[self.ws_instrument_key],
+                                            websocket_response[self.ws_bid_key],
+                                            websocket_response[self.ws_ask_key],
+                                            batch_options)
         
-        bid = websocket_response[self.ws_bid_key]
-        ask = websocket_response[self.ws_ask_key]
-        timestamp = websocket_response[self.ws_timestamp_key]
+    def update_instrument_price(self, instrument_name, bid, ask, batch_options=False):
         asset_type = self.instrument_manager.name_to_instrument_type[instrument_name]
+        option_updated = False
 
         if asset_type == "options":
             instrument_object = self.instrument_manager.options[instrument_name]
-            instrument_object.update_price(bid, ask)
-
-            for price_type, data_object in self.data_container_manager.objects.items():
-                    idx = self.instrument_manager.options_maps.name_index_map[instrument_name]
-                    jdx = instrument_object.price_type_idx_map[price_type]
-                    data_object.raw.update_all_metrics(idx, jdx, *instrument_object.get_all_metrics(), instrument_object.valid_price)
-                    self.instrument_manager.ensure_pair_OTM_flag(instrument_name, instrument_object.OTM)
+            if batch_options:
+                option_updated = instrument_object.update_price_batched(bid, ask)
+            else:
+                instrument_object.update_price(bid, ask)
+                self.instrument_manager.ensure_pair_OTM_flag(instrument_name, instrument_object.OTM)
 
         elif asset_type == "futures":
             instrument_object = self.instrument_manager.futures[instrument_name]
-            instrument_object.update_price(bid, ask)
+            if instrument_object.update_price(bid, ask):
+                self._mark_underlying_moved(instrument_name)
         else:
             instrument_object = self.instrument_manager.spot[instrument_name]
-            instrument_object.update_price(bid, ask)
+            if instrument_object.update_price(bid, ask):
+                self._mark_underlying_moved(instrument_name)
+        return option_updated
+
+    def sweep_stale_quotes(self):
+        self.n_stale = self._sweep_stale_quotes()
+        if self.n_stale > 0:
+            self.n_underlying_repriced = self._reprice_underlying_moves()
+            self._update_data_containers(np.ones(len(OptionBook.price_type_idx_map), dtype=bool))
+        return self.n_stale
+
+    def _sweep_stale_quotes(self):
+        now = time.time()
+        n_stale = 0
+        
+        for category, instruments in (("spot", self.instrument_manager.spot), ("future", self.instrument_manager.futures)):
+            ttl = self.stale_quote_ttl.get(category)
+            if ttl is None:
+                continue
+            for instrument_name, instrument_object in instruments.items():
+                if now - instrument_object.last_update_time > ttl and not np.isnan(instrument_object.mid):
+                    instrument_object.invalidate_price()
+                    self._mark_underlying_moved(instrument_name)
+                    n_stale += 1
+        
+        ttl = self.stale_quote_ttl.get("option")
+        if not ttl is None:
+            option_book = self.instrument_manager.option_book
+            stale_idx = np.flatnonzero((now - option_book.last_update_time > ttl)
+                                       & (option_book.valid_price | ~np.isnan(option_book.mid)))
+            if stale_idx.size > 0:
+                option_book.invalidate_rows(stale_idx)
+                n_stale += stale_idx.size
+        return n_stale
+
+    def _changed_price_types(self, idx, price_type_before, OTM_before, moneyness_before):
+        option_book = self.instrument_manager.option_book
+        changed = np.zeros(len(OptionBook.price_type_idx_map), dtype=bool)
+        for column, before in price_type_before.items():
+            after = getattr(option_book, column)[:, idx]
+            changed |= ~np.isclose(before, after, rtol=self._change_rtol, atol=0, equal_nan=True).all(axis=1)
+        
+        for column, before in moneyness_before.items():
+            after = getattr(option_book, column)[idx]
+            if not np.isclose(before, after, rtol=self._change_rtol, atol=0, equal_nan=True).all():
+                changed[:] = True
+        if not np.array_equal(OTM_before, option_book.OTM):
+            changed[:] = True
+        return changed
+
+    def _price_options_batch(self, option_objects):
+        option_book = self.instrument_manager.option_book
+        name_index_map = self.instrument_manager.options_maps.name_index_map
+        engine_groups = {}
+        for option_object in option_objects:
+            engine_groups.setdefault(type(option_object.option_engine), []).append(option_object)
+        
+        for engine_class, option_group in engine_groups.items():
+            n_group = len(option_group)
+            idx = np.fromiter((name_index_map[option_object.instrument_name] for option_object in option_group), dtype=int, count=n_group)
+            engines = [option_object.option_engine for option_object in option_group]
+            option_prices = np.vstack((option_book.bid[idx], option_book.ask[idx], option_book.mid[idx]))
+            underlying_prices = np.fromiter((option_object.underlying_object.mid for option_object in option_group), dtype=float, count=n_group)
+            underlying_valid = np.fromiter((option_object.underlying_object.valid_price for option_object in option_group), dtype=bool, count=n_group)
+            
+            option_book.ivol[:, idx] = engine_class.calculate_IVOL_batch(engines, option_prices, underlying_prices, yte=self._yte(idx))
+            self._update_greeks_batch(engine_class, engines, idx, underlying_prices, option_book.valid_price[idx] & underlying_valid)
+            self._update_moneyness_batch(idx, underlying_prices, underlying_valid)
+        
+        for option_object in option_objects:
+            self.instrument_manager.ensure_pair_OTM_flag(option_object.instrument_name, option_object.OTM)
+
+    def _update_moneyness_batch(self, idx, underlying_prices, underlying_valid):
+        option_book = self.instrument_manager.option_book
+        strike = option_book.strike[idx]
+        option_book.underlying_price[idx] = underlying_prices
+        
+        with np.errstate(invalid="ignore", divide="ignore"):
+            moneyness = np.where(underlying_valid, strike / underlying_prices, np.nan)
+            log_moneyness = np.log(moneyness)
+            option_book.moneyness[idx] = moneyness
+            option_book.log_moneyness[idx] = log_moneyness
+            option_book.standardised_moneyness[:, idx] = log_moneyness / (option_book.ivol[:, idx] * np.sqrt(self._yte(idx)))
+        
+        OTM = np.where(option_book.call_flag[idx], underlying_prices < strike, underlying_prices >= strike)
+        option_book.OTM[idx] = np.where(underlying_valid, OTM, option_book.OTM[idx])
+
+    def _yte(self, idx):
+        return utils.year_fraction_clock.yte[self.instrument_manager.option_book.expiry_idx[idx]]
+
+    def _mark_underlying_moved(self, instrument_name):
+        if instrument_name in self.instrument_manager.underlying_option_idx_map:
+            self._moved_underlyings.add(instrument_name)
+
+    def _get_underlying_engine_groups(self, underlying_name):
+        if not underlying_name in self._underlying_engine_groups:
+            options = self.instrument_manager.options
+            index_name_map = self.instrument_manager.options_maps.index_name_map
+            groups = {}
+            for idx in self.instrument_manager.underlying_option_idx_map[underlying_name]:
+                option_object = options[index_name_map[idx]]
+                groups.setdefault(type(option_object.option_engine), []).append(idx)
+            self._underlying_engine_groups[underlying_name] = [(engine_class,
+                                                                np.array(idx_list, dtype=int),
+                                                                [options[index_name_map[idx]].option_engine for idx in idx_list])
+                                                               for engine_class, idx_list in groups.items()]
+        return self._underlying_engine_groups[underlying_name]
 
-        if time.time() - self._last_update_checker_timer > 20:
-            for option_object in self.instrument_manager.options.values():
-                if time.time() - option_object.last_update_time > 20:
-                    option_object.update_price()
+    def _reprice_underlying_moves(self):
+        option_book = self.instrument_manager.option_book
+        n_repriced = 0
+        for underlying_name in self._moved_underlyings:
+            underlying_object = self.instrument_manager.all_instrument_objects[underlying_name]
+            for engine_class, idx, engines in self._get_underlying_engine_groups(underlying_name):
+                underlying_prices = np.full(idx.size, underlying_object.mid)
+                self._update_greeks_batch(engine_class, engines, idx, underlying_prices, option_book.valid_price[idx] & underlying_object.valid_price)
+                self._update_moneyness_batch(idx, underlying_prices, underlying_object.valid_price)
+                n_repriced += idx.size
+        self._moved_underlyings.clear()
+        return n_repriced
+
+    def _update_greeks_batch(self, engine_class, engines, idx, underlying_prices, valid_mask):
+        option_book = self.instrument_manager.option_book
+        delta, gamma, vega, theta, rho = engine_class.calculate_all_greeks_batch(engines,
+                                                                                 option_book.ivol[:, idx],
+                                                                                 underlying_prices,
+                                                                                 out=self._greeks_buffer.view(idx.size),
+                                                                                 yte=self._yte(idx))
+        option_book.delta[:, idx] = delta
+        option_book.delta_mag[:, idx] = np.abs(delta)
+        option_book.gamma[:, idx] = gamma
+        option_book.vega[:, idx] = vega
+        option_book.theta[:, idx] = theta
+        option_book.rho[:, idx] = rho
+        
+        invalid_idx = idx[~valid_mask]
+        for greek in ("delta", "delta_mag", "gamma", "vega", "theta", "rho"):
+            getattr(option_book, greek)[:, invalid_idx] = np.nan
 
     def check_enough_time(self, ):
         if time.time() - self.last_process_update > self.timer_process_data:            
@@ -122,40 +379,137 @@ class PriceProcessor:
         else:
             return False
     
+    def _response_instrument_name(self, websocket_response):
+        if isinstance(websocket_response, utils.Tick):
+            return websocket_response.instrument_name
+        return websocket_response[self.ws_instrument_key]
+
     def bulk_response(self, websocket_responses):
         for websocket_response in websocket_responses:
-            instrument_name = websocket_response[self.ws_instrument_key]
+            instrument_name = self._response_instrument_name(websocket_response)
             self.last_buffer_responses[instrument_name] = websocket_response
                 
+    def bulk_ticks(self, ticks):
+        if self._pending_ticks.size > 0:
+            ticks = np.concatenate((self._pending_ticks, ticks))
+        self._pending_ticks = utils.TickRingBuffer.last_per_instrument(ticks)
+
+    def _pending_tick_items(self):
+        for index, bid, ask in zip(self._pending_ticks["index"].tolist(), self._pending_ticks["bid"].tolist(), self._pending_ticks["ask"].tolist()):
+            yield self.tick_instrument_names[index], bid, ask
+
     def update_response_buffer(self, websocket_response):
-        instrument_name = websocket_response[self.ws_instrument_key]
+        instrument_name = self._response_instrument_name(websocket_response)
         self.last_buffer_responses[instrument_name] = websocket_response
 
+    def _underlyings_first(self, websocket_response):
+        return self.instrument_manager.name_to_instrument_type[self._response_instrument_name(websocket_response)] == "options"
+
     def _update_term_structure_engine(self, term_structure_config):
         if term_structure_config["use_ws_response"]:
             coupled = set(self.last_buffer_responses.keys()) & set(term_structure_config["instrument_list"])
+            engine = term_structure_config["engine"]
+            filtered_responses = {}
+            for ins_name in coupled:
+                websocket_response = self.last_buffer_responses[ins_name]
+                if isinstance(websocket_response, utils.Tick):
+                    websocket_response = {engine.bid_key : websocket_response.bid, engine.ask_key : websocket_response.ask}
+                filtered_responses[ins_name] = websocket_response
+            if self._pending_ticks.size > 0:
+                instrument_list = set(term_structure_config["instrument_list"])
+                for instrument_name, bid, ask in self._pending_tick_items():
+                    if instrument_name in instrument_list:
+                        filtered_responses[instrument_name] = {engine.bid_key : bid, engine.ask_key : ask}
                         
-            if len(coupled) > 0:
-                filtered_responses = {ins_name : self.last_buffer_responses[ins_name] for ins_name in coupled}
+            if len(filtered_responses) > 0:
                 term_structure_config["engine"].update_data(filtered_responses)
                 term_structure_config["engine"].fit()
                 
     def update_price_with_buffer(self):
+        utils.year_fraction_clock.tick()
         self._update_term_structure_engine(self.interest_rate_config)
         self._update_term_structure_engine(self.dividend_rate_config)
 
-        for instrument_name, websocket_response in self.last_buffer_responses.copy().items():
+        option_book = self.instrument_manager.option_book
+        name_index_map = self.instrument_manager.options_maps.name_index_map
+        OTM_before = option_book.OTM.copy()
+        
+        for websocket_response in sorted(self.last_buffer_responses.values(), key=self._underlyings_first):
+            if self.update_price(websocket_response, batch_options=True):
+                self._dirty_idx.add(name_index_map[self._response_instrument_name(websocket_response)])
+        
+        name_to_instrument_type = self.instrument_manager.name_to_instrument_type
+        for instrument_name, bid, ask in sorted(self._pending_tick_items(), key=lambda tick: name_to_instrument_type[tick[0]] == "options"):
+            if self.update_instrument_price(instrument_name, bid, ask, batch_options=True):
+                self._dirty_idx.add(name_index_map[instrument_name])
 
+        self.last_buffer_responses.clear()
+        self._pending_ticks = self._pending_ticks[:0]
+        self.n_underlying_repriced = self._reprice_underlying_moves()
+        self.n_dirty = len(self._dirty_idx)
+        changed = np.full(len(OptionBook.price_type_idx_map), self.n_underlying_repriced > 0)
+        if self.n_dirty > 0:
+            idx = np.fromiter(sorted(self._dirty_idx), dtype=int, count=self.n_dirty)
+            self._dirty_idx.clear()
+            price_type_before = {column : getattr(option_book, column)[:, idx] for column in self._transform_price_type_columns}
+            moneyness_before = {column : getattr(option_book, column)[idx] for column in self._transform_option_columns}
             
-            self.update_price(websocket_response)
-            del self.last_buffer_responses[instrument_name]
-
-        self.last_buffer_responses.clear()        
+            index_name_map = self.instrument_manager.options_maps.index_name_map
+            self._price_options_batch([self.instrument_manager.options[index_name_map[i]] for i in idx])
+            changed |= self._changed_price_types(idx, price_type_before, OTM_before, moneyness_before)
+            
+        self._update_data_containers(changed)
+        if not changed.any() and self.n_dirty > 0:
+            self.data_container_manager.publish()
+        self.last_process_update=time.time()
 
-        for data_object in self.data_container_manager.objects.values():
-            x, y, z, idx_map = self.axis_transformer.transform_data(data_object.raw)
-            data_object.update_dataclasses(x, y, z, idx_map)
+    def _update_data_containers(self, changed):
+        for price_type, data_object in self.data_container_manager.objects.items():
+            if changed[OptionBook.price_type_idx_map[price_type]]:
+                x, y, z, idx_map = self.axis_transformer.transform_data(data_object.raw)
+                data_object.update_dataclasses(x, y, z, idx_map)
         
-        self.data_container_manager.process_update()        
-        self.last_process_update=time.time()
+        if changed.any():
+            self.data_container_manager.process_update()        
+
+
+
+class PriceProcessWorker(QtCore.QObject):
+    processed_signal = QtCore.Signal()
 
+    def __init__(self, price_processor, data_mutex, response_buffer_flag=True):
+        super().__init__()
+        self.price_processor=price_processor
+        self.data_mutex=data_mutex
+        self.response_buffer_flag=response_buffer_flag
+        self.stale_sweep_timer = QtCore.QTimer(self)
+        self.stale_sweep_timer.timeout.connect(self.sweep_stale_quotes)
+
+    @QtCore.Slot()
+    def start_stale_sweep(self):
+        if self.price_processor.stale_sweep_interval:
+            self.stale_sweep_timer.start(int(self.price_processor.stale_sweep_interval * 1000))
+
+    @QtCore.Slot()
+    def sweep_stale_quotes(self):
+        with QtCore.QMutexLocker(self.data_mutex):
+            n_stale = self.price_processor.sweep_stale_quotes()
+        if n_stale > 0:
+            self.processed_signal.emit()
+
+    @QtCore.Slot(list, bool)
+    def process_market_data(self, websocket_response, bulk_response=False):
+        if self.response_buffer_flag:
+            if bulk_response and len(websocket_response) > 0 and isinstance(websocket_response[0], np.ndarray):
+                self.price_processor.bulk_ticks(websocket_response[0])
+            elif bulk_response:
+                self.price_processor.bulk_response(websocket_response)
+            else:
+                self.price_processor.update_response_buffer(websocket_response[0])
+
+            if self.price_processor.check_enough_time():
+                with QtCore.QMutexLocker(self.data_mutex):
+                    self.price_processor.update_price_with_buffer()
+                self.processed_signal.emit()
+        else:
+            self.price_processor.update_response_buffer(websocket_response[0])